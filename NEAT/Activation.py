@@ -0,0 +1,137 @@
+import numpy as np
+from math import e, tanh
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Scalar versions (used by Node.evaluate)
+
+def sigmoid(x):
+    """
+    Steepened sigmoid (the one from the NEAT paper)
+
+    Params
+    ----------
+    x : (value)
+    """
+    # Clip to avoid overflows (same limit as vectorSigmoid, so both give the same result)
+    x = min(100, max(-100, x))
+    return 1 / (1+e**(-4.9*x))
+
+
+def identity(x):
+    """
+    Identity : the value goes through as it is
+
+    Params
+    ----------
+    x : (value)
+    """
+    return x
+
+
+def relu(x):
+    """
+    Rectified linear unit
+
+    Params
+    ----------
+    x : (value)
+    """
+    return max(0, x)
+
+
+def gaussian(x):
+    """
+    Gaussian bump centered on 0
+
+    Params
+    ----------
+    x : (value)
+    """
+    return e**(-x*x)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Vectorized versions (used by batch evaluation, x is a numpy array)
+
+def vectorSigmoid(x):
+    """
+    Steepened sigmoid on a whole array
+
+    Params
+    ----------
+    x : (np.array)
+    """
+    # Clip to avoid overflows in exp (the result is the same up to the precision of the array)
+    limit = 100 if x.dtype == np.float64 else 17
+    return 1 / (1 + np.exp(-4.9*np.clip(x, -limit, limit)))
+
+
+def vectorIdentity(x):
+    """
+    Identity on a whole array
+
+    Params
+    ----------
+    x : (np.array)
+    """
+    return x
+
+
+def vectorRelu(x):
+    """
+    Rectified linear unit on a whole array
+
+    Params
+    ----------
+    x : (np.array)
+    """
+    return np.maximum(x, 0)
+
+
+def vectorGaussian(x):
+    """
+    Gaussian bump on a whole array
+
+    Params
+    ----------
+    x : (np.array)
+    """
+    return np.exp(-x*x)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Registry
+# name : (scalar function, vectorized function)
+activationFunctions = {'sigmoid' : (sigmoid, vectorSigmoid),
+                       'tanh' : (tanh, np.tanh),
+                       'relu' : (relu, vectorRelu),
+                       'identity' : (identity, vectorIdentity),
+                       'gaussian' : (gaussian, vectorGaussian)}
+
+
+def addActivation(name, scalar, vector):
+    """
+    Register a new activation function
+
+    Params
+    ----------
+    name : name used by the nodes to refer to it (str)
+    scalar : function used on a single value (func)
+    vector : same function, working on a whole numpy array (func)
+    """
+    activationFunctions[name] = (scalar, vector)
+
+
+def getActivation(name):
+    """
+    Get the (scalar, vectorized) functions of an activation
+
+    Params
+    ----------
+    name : name of the activation (str)
+    """
+    try:
+        return activationFunctions[name]
+    except KeyError:
+        raise ValueError('Unknown activation function : {}'.format(name))
@@ -0,0 +1,182 @@
+import json
+import pickle
+import numpy as np
+from collections import deque
+
+
+class GenerationLog:
+    """
+    Compact summaries of the past generations (a few numbers each, no genomes)
+    """
+
+    def __init__(self, size = None, path = None):
+        """
+        Make a new log
+
+        Params
+        ----------
+        size : nb of summaries kept in memory (int, None : keep all of them)
+        path : file where the older summaries are written, one json per line (str, None : they are forgotten)
+        """
+        self.size = size
+        self.path = path
+        self.summaries = deque()
+        self.spilled = 0  # Nb of summaries that left the memory
+
+    def __repr__(self):
+        """
+        Defines how a log is shown in console
+        """
+        text = 'GenerationLog - {} in memory - {} spilled'.format(len(self.summaries), self.spilled)
+        return '<{}>'.format(text)
+
+    def __len__(self):
+        """
+        Nb of generations recorded (in memory and spilled)
+        """
+        return len(self.summaries) + self.spilled
+
+    def add(self, summary):
+        """
+        Record the summary of a generation
+
+        Params
+        ----------
+        summary : (dict)
+        """
+        self.summaries.append(summary)
+        if self.size is not None:
+            while len(self.summaries) > self.size:
+                self.spill(self.summaries.popleft())
+
+    def spill(self, summary):
+        """
+        Get a summary out of the memory (write it on disk if we have a file)
+
+        Params
+        ----------
+        summary : (dict)
+        """
+        if self.path is not None:
+            # The file is started over by the first summary that gets in it
+            with open(self.path, 'a' if self.spilled else 'w') as file:
+                file.write(json.dumps(summary) + '\n')
+        self.spilled += 1
+
+    def load(self):
+        """
+        Get all the summaries we still have (the ones on disk first, then the ones in memory)
+        """
+        summaries = []
+        if self.path is not None and self.spilled > 0:
+            with open(self.path) as file:
+                for line in file:
+                    summaries.append(json.loads(line))
+        return summaries + list(self.summaries)
+
+
+class HallOfFame:
+    """
+    The best genomes of all time (full genomes, each one only once)
+    The best ones are kept in memory, the ones that get pushed out are written in a file (if we have one)
+    """
+
+    def __init__(self, size = 10, path = None):
+        """
+        Make a new hall of fame
+
+        Params
+        ----------
+        size : nb of genomes kept in memory (int)
+        path : file where the genomes pushed out of the memory are written (str, None : they are forgotten)
+        """
+        self.size = size
+        self.path = path
+        self.genomeList = []  # Fittest first
+        self.hashes = set()  # Hash of the genomes we have (see Genome.genomeHash)
+        # Genomes in the file : (raw fitness, offset, nb of bytes, hash), in the order they were written
+        self.spilled = []
+
+    def __repr__(self):
+        """
+        Defines how a hall of fame is shown in console
+        """
+        text = 'HallOfFame - {}/{} genomes - {} spilled'.format(len(self.genomeList), self.size, len(self.spilled))
+        return '<{}>'.format(text)
+
+    def __len__(self):
+        return len(self.genomeList)
+
+    def __iter__(self):
+        return iter(self.genomeList)
+
+    def add(self, genome):
+        """
+        Try to get a genome in the hall of fame (nothing happens if we already have the same genome)
+
+        Params
+        ----------
+        genome : (Genome)
+        """
+        key = genome.genomeHash()
+        if key in self.hashes:
+            return
+        self.hashes.add(key)
+        # Insert it at its place (the oldest one goes first if there is a tie)
+        i = len(self.genomeList)
+        while i > 0 and genome.rawFitness > self.genomeList[i-1].rawFitness:
+            i -= 1
+        self.genomeList.insert(i, genome)
+        while len(self.genomeList) > self.size:
+            self.spill(self.genomeList.pop())
+
+    def spill(self, genome):
+        """
+        Get a genome out of the memory (write it on disk if we have a file)
+        It's packed alone (see Checkpoint.packGenomes) and appended to the file
+
+        Params
+        ----------
+        genome : (Genome)
+        """
+        key = genome.genomeHash()
+        if self.path is None:
+            self.hashes.discard(key)
+            return
+        # Imported here : Checkpoint needs Genome, which isn't needed to keep a log
+        from .Checkpoint import packGenomes
+        data = pickle.dumps(packGenomes([genome]), protocol = pickle.HIGHEST_PROTOCOL)
+        # The file is started over by the first genome that gets in it
+        with open(self.path, 'ab' if self.spilled else 'wb') as file:
+            offset = file.tell()
+            file.write(data)
+        self.spilled.append((float(genome.rawFitness), offset, len(data), key))
+
+    def load(self, entry):
+        """
+        Read a genome of the file
+
+        Params
+        ----------
+        entry : (raw fitness, offset, nb of bytes, hash) (tuple, see spilled)
+        """
+        from .Checkpoint import unpackGenomes
+        with open(self.path, 'rb') as file:
+            file.seek(entry[1])
+            return unpackGenomes(pickle.loads(file.read(entry[2])))[0]
+
+    def top(self, n = 1):
+        """
+        Get the n best genomes
+        The genomes in memory are better than the ones in the file, only the ones needed are read from it
+
+        Params
+        ----------
+        n : (int)
+        """
+        genomes = self.genomeList[:n]
+        if len(genomes) < n and self.spilled:
+            fitness = np.array([entry[0] for entry in self.spilled])
+            order = np.argsort(-fitness, kind = 'stable')[:n - len(genomes)]
+            genomes += [self.load(self.spilled[i]) for i in order.tolist()]
+        return genomes
@@ -0,0 +1,287 @@
+import os
+import gzip
+import pickle
+import threading
+import queue
+import numpy as np
+from .Genome import Genome
+from .Node import Node
+from .Connection import Connection
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Compact version of a list of genomes : a few numpy arrays (fast to copy, to pickle and to send around)
+
+kinds = ('sensor', 'hidden', 'output')
+
+
+def packGenomes(genomes):
+    """
+    Pack genomes in arrays, the genes of genome i are the rows nodeStart[i]:nodeStart[i+1] of nodes
+    and connectionStart[i]:connectionStart[i+1] of connections and weights
+
+    Params
+    ----------
+    genomes : (Genome list)
+
+    Returns
+    ----------
+    pack : (dict)
+        nodes : number, index amongst the nodes with the same number, kind, activation (int array, one row per node)
+        names : node row -> name, for the names that aren't the default one (dict)
+        activations : names of the activations used by nodes (str list)
+        connections : row of the starting node, row of the ending node (in the genome), enabled, innovation number
+                      (int array, one row per connection)
+        weights : (float array, one per connection)
+        nodeStart, connectionStart : (int arrays)
+        sensor, output, bias : per genome (int arrays, sensor includes the bias)
+        params : the different params dicts of the genomes, paramsIndex : the one of each genome
+        rawFitness, sharedFitness, episodes : per genome (arrays)
+    """
+    nodes = []
+    names = {}
+    activations = {}
+    connections = []
+    weights = []
+    nodeStart = [0]
+    connectionStart = [0]
+    paramsList = []
+    paramsIndex = []
+    paramsIds = {}
+    for genome in genomes:
+        index = {}
+        for node in genome.nodeList:
+            index[node.identifier] = len(index)
+            activation = activations.setdefault(node.activation, len(activations))
+            if node.name != str(node.identifier[0]) + '.' + str(node.identifier[1]):
+                names[len(nodes)] = node.name
+            nodes.append((node.identifier[0], node.identifier[1], kinds.index(node.kind), activation))
+        for con in genome.connectionList:
+            connections.append((index[con.nodeIn.identifier], index[con.nodeOut.identifier], con.enabled,
+                                con.innovationNumber))
+            weights.append(con.weight)
+        nodeStart.append(len(nodes))
+        connectionStart.append(len(connections))
+        # Genomes of a population share the same params most of the time
+        if id(genome.params) not in paramsIds:
+            paramsIds[id(genome.params)] = len(paramsList)
+            paramsList.append(dict(genome.params))
+        paramsIndex.append(paramsIds[id(genome.params)])
+    return {'nodes' : np.array(nodes, dtype=np.int64).reshape((-1, 4)),
+            'names' : names,
+            'activations' : list(activations),
+            'connections' : np.array(connections, dtype=np.int64).reshape((-1, 4)),
+            'weights' : np.array(weights, dtype=float),
+            'nodeStart' : np.array(nodeStart, dtype=np.int64),
+            'connectionStart' : np.array(connectionStart, dtype=np.int64),
+            'sensor' : np.array([genome.sensor for genome in genomes], dtype=np.int64),
+            'output' : np.array([genome.output for genome in genomes], dtype=np.int64),
+            'bias' : np.array([genome.biasActive for genome in genomes], dtype=bool),
+            'params' : paramsList,
+            'paramsIndex' : np.array(paramsIndex, dtype=np.int64),
+            'rawFitness' : np.array([genome.rawFitness for genome in genomes], dtype=float),
+            'sharedFitness' : np.array([genome.sharedFitness for genome in genomes], dtype=float),
+            'episodes' : np.array([genome.episodes for genome in genomes], dtype=np.int64)}
+
+
+def unpackGenomes(pack, select = None):
+    """
+    Make the genomes of a pack again (see packGenomes)
+
+    Params
+    ----------
+    pack : (dict)
+    select : indexes of the genomes to unpack (int list, default None : all of them)
+    """
+    if select is None:
+        select = range(len(pack['sensor']))
+    # Python lists are much faster to go through than arrays
+    nodes = pack['nodes'].tolist()
+    connections = pack['connections'].tolist()
+    weights = pack['weights'].tolist()
+    nodeStart = pack['nodeStart'].tolist()
+    connectionStart = pack['connectionStart'].tolist()
+    genomes = []
+    for i in select:
+        bias = bool(pack['bias'][i])
+        params = dict(pack['params'][pack['paramsIndex'][i]], bias = bias, initState = 'none')
+        genome = Genome(int(pack['sensor'][i]) - int(bias), int(pack['output'][i]), **params)
+        genome.params['initState'] = pack['params'][pack['paramsIndex'][i]]['initState']
+        genome.nodeList = []
+        for row in range(nodeStart[i], nodeStart[i+1]):
+            number, sameAs, kind, activation = nodes[row]
+            genome.nodeList.append(Node((number, sameAs), kinds[kind], pack['names'].get(row),
+                                        pack['activations'][activation]))
+        genome.connectionList = []
+        for row in range(connectionStart[i], connectionStart[i+1]):
+            nodeIn, nodeOut, enabled, innovationNumber = connections[row]
+            genome.connectionList.append(Connection(genome.nodeList[nodeIn], genome.nodeList[nodeOut], weights[row],
+                                                    bool(enabled), innovationNumber))
+        genome.rawFitness = float(pack['rawFitness'][i])
+        genome.sharedFitness = float(pack['sharedFitness'][i])
+        genome.episodes = int(pack['episodes'][i])
+        genomes.append(genome)
+    return genomes
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Writing snapshots in the background
+
+class Checkpointer:
+    """
+    Write snapshots of a population (see Population.snapshot) in a background thread
+    The snapshot is pickled, compressed and written next to its final place, then renamed (so a checkpoint is
+    either complete or not there at all)
+    """
+
+    def __init__(self, directory = 'checkpoints', every = 10, keep = 3):
+        """
+        Make a new checkpointer
+
+        Params
+        ----------
+        directory : where the checkpoints are written (str, default 'checkpoints')
+        every : a checkpoint is made every 'every' gen (int, default 10)
+        keep : nb of checkpoints kept, the oldest ones are deleted (int >= 1, default 3, None : keep all of them)
+        """
+        if keep is not None and keep < 1:
+            raise ValueError('At least 1 checkpoint has to be kept (keep = None keeps all of them) : {}'.format(keep))
+        self.directory = directory
+        self.every = every
+        self.keep = keep
+        os.makedirs(directory, exist_ok = True)
+        self.written = 0  # Nb of checkpoints written
+        self.errors = []  # (gen, exception) of the checkpoints that failed
+        # The work is done by a daemon thread fed by a queue
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target = self.work, daemon = True)
+        self.thread.start()
+
+    def __repr__(self):
+        """
+        Defines how a checkpointer is shown in console
+        """
+        text = 'Checkpointer - every {} gen - {} written - {} waiting'.format(self.every, self.written,
+                                                                           self.queue.qsize())
+        return '<{}>'.format(text)
+
+    def due(self, gen):
+        """
+        Tell if a checkpoint has to be made at this gen
+
+        Params
+        ----------
+        gen : (int)
+        """
+        return gen % self.every == 0
+
+    def submit(self, snapshot, gen):
+        """
+        Ask for a snapshot to be written (returns right away)
+
+        Params
+        ----------
+        snapshot : (dict, see Population.snapshot)
+        gen : (int)
+        """
+        self.queue.put((snapshot, gen))
+
+    def path(self, gen):
+        """
+        Path of the checkpoint of a gen
+
+        Params
+        ----------
+        gen : (int)
+        """
+        return os.path.join(self.directory, 'gen{:08d}.pkl.gz'.format(gen))
+
+    def checkpoints(self):
+        """
+        Paths of the checkpoints on disk, oldest first
+        """
+        names = sorted(name for name in os.listdir(self.directory) if name.startswith('gen') and name.endswith('.pkl.gz'))
+        return [os.path.join(self.directory, name) for name in names]
+
+    def latest(self):
+        """
+        Path of the last checkpoint (None if there is none)
+        """
+        checkpoints = self.checkpoints()
+        return checkpoints[-1] if checkpoints else None
+
+    def work(self):
+        """
+        Loop of the background thread
+        """
+        while True:
+            item = self.queue.get()
+            if item is None:
+                # Sent by close
+                self.queue.task_done()
+                return
+            snapshot, gen = item
+            try:
+                self.write(snapshot, gen)
+                self.prune()
+            except Exception as exception:
+                # We don't want a full disk to kill the thread
+                self.errors.append((gen, exception))
+            finally:
+                self.queue.task_done()
+
+    def write(self, snapshot, gen):
+        """
+        Write a snapshot (atomically)
+
+        Params
+        ----------
+        snapshot : (dict)
+        gen : (int)
+        """
+        data = gzip.compress(pickle.dumps(snapshot, protocol = pickle.HIGHEST_PROTOCOL), compresslevel = 6)
+        path = self.path(gen)
+        temp = path + '.tmp'
+        with open(temp, 'wb') as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp, path)
+        self.written += 1
+
+    def prune(self):
+        """
+        Delete the oldest checkpoints (retention policy)
+        """
+        if self.keep is None:
+            return
+        for path in self.checkpoints()[:-self.keep]:
+            os.remove(path)
+
+    def wait(self):
+        """
+        Wait until everything that has been submitted is written
+        """
+        self.queue.join()
+
+    def close(self):
+        """
+        Write everything that has been submitted, then stop the background thread
+        """
+        if not self.thread.is_alive():
+            return
+        self.wait()
+        self.queue.put(None)
+        self.thread.join()
+
+
+def load(path):
+    """
+    Read a checkpoint
+
+    Params
+    ----------
+    path : (str)
+    """
+    with gzip.open(path, 'rb') as file:
+        return pickle.load(file)
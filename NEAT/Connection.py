@@ -3,7 +3,7 @@ from copy import copy
 
 class Connection:
 
-    def __init__(self, nodeIn, nodeOut, weight, enabled, innovationNumber):
+    def __init__(self, nodeIn, nodeOut, weight, enabled, innovationNumber, rng = None):
         """
         Make a new connection
 
@@ -14,11 +14,14 @@ class Connection:
         weight: The weight (-1 to 1 / 'random')
         enabled: Say if the connection is enabled or not (bool)
         innovationNumber: (int)
+        rng: Random generator used for a random weight (np.random.Generator, default np.random)
         """
         self.nodeIn = nodeIn
         self.nodeOut = nodeOut
         if type(weight) == str and weight == 'random':
-            self.weight = 2*np.random.rand() - 1
+            if rng is None:
+                rng = np.random
+            self.weight = 2*rng.random() - 1
         else:
             self.weight = weight
         self.enabled = enabled
@@ -1,18 +1,26 @@
-from Node import Node
-from Connection import Connection
-from History import History
+from .Node import Node
+from .Connection import Connection
+from .History import History
 import numpy as np
 # My own queue module
-from Queue import PriorityQueue
-from graphviz import Digraph
+from .Queue import PriorityQueue
+from .Phenotype import Phenotype
+from .Loss import streamScore
 from copy import copy
+import hashlib
+import weakref
+import gc
+from collections import OrderedDict
 
 class Genome:
 
     # Innovation history for the connection genes
     innovationHistory = []
+    # Intern table of the topologies : structure hash -> Phenotype (without weights)
+    # Genomes with the same topology share the same one (it's forgotten once no genome uses it anymore)
+    topologies = weakref.WeakValueDictionary()
 
-    def __init__(self, sensor, output, **kwargs):
+    def __init__(self, sensor, output, rng = None, **kwargs):
         """
         Initialize a net
 
@@ -20,19 +28,48 @@ class Genome:
         ----------
         sensor : nb of sensor nodes (bias not included) (int)
         output: nb of output nodes (int)
+        rng: Random generator used to make the first connections (np.random.Generator, default np.random)
         bias: include a bias ? (bool, default True)
         initState: What is the state of a new net ? ('none', 'one link', 'all linked', default 'one link')
         sensorName : Name of the sensors (str list)
         outputName : Name of the outputs (str list)
+        sensorActivation : Activation function of the sensors (str, default 'sigmoid')
+        hiddenActivation : Activation function of the hidden nodes (str, default 'sigmoid')
+        outputActivation : Activation function of the outputs (str, default 'sigmoid')
+        precision : Precision of the weights and of the batch evaluations, evaluate stays in float64
+                    ('float64', 'float32', default 'float64')
+        maxHidden : Max nb of hidden nodes (int, default None : no limit)
+        maxConnections : Max nb of connection genes, disabled ones included (int, default None : no limit)
+        deleteConnectionRate : Probability of the delete connection mutation (float, default 0)
+        deleteNodeRate : Probability of the delete node mutation (float, default 0)
+        memoSize : If given, the outputs of the last 'memoSize' different inputs are kept (nets without recurrent
+                   connections only), see memoStats (int, default None : nothing is kept)
         """
         # Default params
         params = {'bias' : True,
                   'initState' : 'one link',
                   'sensorName' : None,
-                  'outputName': None}
+                  'outputName': None,
+                  'sensorActivation' : 'sigmoid',
+                  'hiddenActivation' : 'sigmoid',
+                  'outputActivation' : 'sigmoid',
+                  'precision' : 'float64',
+                  'maxHidden' : None,
+                  'maxConnections' : None,
+                  'deleteConnectionRate' : 0,
+                  'deleteNodeRate' : 0,
+                  'memoSize' : None}
         # Update params
         for key in kwargs:
             params[key] = kwargs[key]
+        # Keep them (the children of this genome are made with the same params)
+        self.params = params
+        # The weights are stored at this precision, and the batch evaluations are made with it
+        self.dtype = np.dtype(params['precision'])
+        # Outputs of the last inputs (LRU : inputs tuple -> outputs), forgotten when the net changes
+        self.memo = None if params['memoSize'] is None else OrderedDict()
+        self.memoHits = 0
+        self.memoMisses = 0
 
         # Handle the nodes
         self.sensor = sensor + int(params['bias'])
@@ -63,21 +100,97 @@ class Genome:
         # Handle the connections
         self.connectionList = []
         if params['initState'] == 'all linked':
+            if rng is None:
+                rng = np.random
             # Link all the sensors to the outputs
             for node1 in self.nodeList[:self.sensor]:
                 for node2 in self.nodeList[self.sensor:]:
                     innovationNumber = self.getInnovationNumber(node1, node2)
-                    self.addConnection(Connection(node1, node2, 'random', True, innovationNumber))
+                    self.addConnection(Connection(node1, node2, self.clipWeight(2*rng.random() - 1), True,
+                                                  innovationNumber))
         elif params['initState'] == 'one link':
-            self.addConnectionMutation()
+            self.addConnectionMutation(rng)
 
         # Other stuff
         self.rawFitness = 0  # The raw fitness of the genome
         self.sharedFitness = 0  # The fitness of the genome biased according to the size of the species it belongs to
+        self.episodes = 0  # Nb of episodes played to get the raw fitness (see Racing.py)
+        # Shared topology (see topology)
+        self.phenotype = None
+        self.phenotypeKey = None
+        # Pruned evaluation view (see prunedView) and structure hash (see structureHash), forgotten when the net changes
+        self.view = None
+        self.structureKey = None
+
+    @staticmethod
+    def initPopulation(count, sensor, output, rng = None, **kwargs):
+        """
+        Make a whole population of new nets at once (same result as 'count' calls to Genome, but much faster)
+        The initial topology and its innovation numbers are made once, and all the weights are drawn at once
+
+        Params
+        ----------
+        count : nb of nets (int)
+        sensor, output, rng and the other params : see Genome
+        """
+        if rng is None:
+            rng = np.random
+        # The template has the nodes every new net starts with
+        initState = kwargs.get('initState', 'one link')
+        template = Genome(sensor, output, **dict(kwargs, initState = 'none'))
+        template.params['initState'] = initState
+        # Possible connections (indexes in nodeList) : from every sensor to every output (there is no hidden node yet)
+        pairs = []
+        for i in range(template.sensor):
+            for j in range(template.sensor, len(template.nodeList)):
+                pairs.append((i, j))
+        if initState == 'all linked':
+            links = np.tile(np.arange(len(pairs)), (count, 1))
+        elif initState == 'one link':
+            links = rng.choice(len(pairs), size = count).reshape((count, 1))
+        else:
+            links = np.zeros((count, 0), dtype = int)
+        weights = (2*rng.random(links.shape) - 1).astype(template.dtype)
+        # Innovation numbers, given in the order they first appear (like 'count' calls to Genome would)
+        used, first = np.unique(links.ravel(), return_index = True)
+        innovations = {}
+        for pair in used[np.argsort(first)]:
+            i, j = pairs[pair]
+            innovations[pair] = Genome.getInnovationNumber(template.nodeList[i], template.nodeList[j])
+
+        # Make the nets : copy the template without going through __init__
+        state = template.__dict__
+        nodeStates = [node.__dict__ for node in template.nodeList]
+        genomeList = []
+        # Nothing made here can be garbage, and the collector would go through the whole population again and again
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            for row, rowWeights in zip(links.tolist(), weights.tolist()):
+                genome = Genome.__new__(Genome)
+                genome.__dict__.update(state)
+                if genome.memo is not None:
+                    genome.memo = OrderedDict()
+                nodeList = []
+                for nodeState in nodeStates:
+                    node = Node.__new__(Node)
+                    node.__dict__.update(nodeState)
+                    nodeList.append(node)
+                genome.nodeList = nodeList
+                connectionList = []
+                for pair, weight in zip(row, rowWeights):
+                    i, j = pairs[pair]
+                    connectionList.append(Connection(nodeList[i], nodeList[j], weight, True, innovations[pair]))
+                genome.connectionList = connectionList
+                genomeList.append(genome)
+        finally:
+            if collecting:
+                gc.enable()
+        return genomeList
 
     # ------------------------------------------------------------------------------------------------------------------
     # Tools
-    def addNode(self, kind, number, name = None):
+    def addNode(self, kind, number, name = None, activation = None):
         """
         Add a node to the network
 
@@ -85,16 +198,22 @@ class Genome:
         ----------
         kind: kind of node ('sensor', 'hidden', 'output')
         name : Name of the node
+        activation : Activation function of the node (str, default : the one of its kind in the params)
         """
-        sameAs = 0  # Count the number of nodes with the same number
+        if activation is None:
+            activation = self.params[kind + 'Activation']
+        # Index of the node amongst the ones with the same number
+        # (one more than the highest one : nodes can be deleted, counting them could give an identifier twice)
+        sameAs = 0
         for node in self.nodeList:
             if node.number == number:
-                sameAs += 1
+                sameAs = max(sameAs, node.identifier[1] + 1)
         # Get a unique identifier (unique for this genome) -> For more information, see Bug #1
         identifier = (number, sameAs)
         # Make the node and add it to the genome
-        node = Node(identifier, kind, name)
+        node = Node(identifier, kind, name, activation)
         self.nodeList.append(node)
+        self.invalidate()
         return node
 
 
@@ -107,47 +226,131 @@ class Genome:
         connection: (Connection)
         """
         self.connectionList.append(connection)
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Forget the pruned view of the net, its structure hash and the memorized outputs
+        Called by every change made through the methods of the genome, call it after changing genes by hand
+        """
+        self.view = None
+        self.structureKey = None
+        if self.memo is not None:
+            self.memo.clear()
+
+    def memoStats(self):
+        """
+        Hits, misses and hit rate of the memorized outputs (see memoSize)
+        """
+        total = self.memoHits + self.memoMisses
+        return {'hits' : self.memoHits,
+                'misses' : self.memoMisses,
+                'hitRate' : self.memoHits / total if total else 0.0,
+                'size' : 0 if self.memo is None else len(self.memo)}
+
+    def hiddenCount(self):
+        """
+        Nb of hidden nodes
+        """
+        return len(self.nodeList) - self.sensor - self.output
+
+    def complexity(self):
+        """
+        Nb of hidden nodes and enabled connections (what the evaluation of the net costs)
+        """
+        return self.hiddenCount() + sum(con.enabled for con in self.connectionList)
+
+    def withinCaps(self, hidden = 0, connections = 0):
+        """
+        Tell if the net would still be within the caps (see maxHidden and maxConnections) after adding genes
+
+        Params
+        ----------
+        hidden : nb of hidden nodes added (int, default 0)
+        connections : nb of connections added (int, default 0)
+        """
+        if self.params['maxHidden'] is not None and self.hiddenCount() + hidden > self.params['maxHidden']:
+            return False
+        if self.params['maxConnections'] is not None and \
+                len(self.connectionList) + connections > self.params['maxConnections']:
+            return False
+        return True
 
     # ------------------------------------------------------------------------------------------------------------------
     # Mutation
 
-    def mutate(self):
+    def mutate(self, rng = None):
         """
         Make the network mutate
+
+        Params
+        ----------
+        rng: Random generator used by the mutations (np.random.Generator, default np.random)
         """
+        if rng is None:
+            rng = np.random
         # Weight mutation : 80%
-        if np.random.rand() <= 0.8:
-            self.weightMutation()
+        if rng.random() <= 0.8:
+            self.weightMutation(rng)
         # Add connection mutation : 5%
-        if np.random.rand() <= 0.05:
-            self.addConnectionMutation()
+        if rng.random() <= 0.05:
+            self.addConnectionMutation(rng)
         # Add node mutation : 3%
-        if np.random.rand() <= 0.03:
-            self.addNodeMutation()
+        if rng.random() <= 0.03:
+            self.addNodeMutation(rng)
+        # Delete mutations (only drawn when they are used, so that the runs without them don't change)
+        if self.params['deleteConnectionRate'] and rng.random() < self.params['deleteConnectionRate']:
+            self.deleteConnectionMutation(rng)
+        if self.params['deleteNodeRate'] and rng.random() < self.params['deleteNodeRate']:
+            self.deleteNodeMutation(rng)
 
 
-    def weightMutation(self):
+    def weightMutation(self, rng = None):
         """
         Make the weights mutate
+
+        Params
+        ----------
+        rng: Random generator (np.random.Generator, default np.random)
         """
+        if rng is None:
+            rng = np.random
         for connection in self.connectionList:
             # Uniform mutation : 90%
-            if np.random.rand() < 0.9:
-                connection.weight += np.random.uniform(-0.5, 0.5)
-                # Keep it between -1 and 1
-                connection.weight = max(-1, connection.weight)
-                connection.weight = min(1, connection.weight)
+            if rng.random() < 0.9:
+                weight = connection.weight + rng.uniform(-0.5, 0.5)
             # New weight : 10%
             else:
-                connection.weight = 2*np.random.rand() - 1
+                weight = 2*rng.random() - 1
+            connection.weight = self.clipWeight(weight)
+        self.invalidate()
+
+    def clipWeight(self, weight):
+        """
+        Keep a weight between -1 and 1, at the precision of the genome
+
+        Params
+        ----------
+        weight : (float)
+        """
+        return float(self.dtype.type(min(1, max(-1, weight))))
                 
 
-    def addConnectionMutation(self):
+    def addConnectionMutation(self, rng = None):
         """
         Mutation : add a connection to the net
 
         We pick 2 unconnected nodes to connect them together
+
+        Params
+        ----------
+        rng: Random generator (np.random.Generator, default np.random)
         """
+        if rng is None:
+            rng = np.random
+        # The net can't get bigger than the cap
+        if not self.withinCaps(connections = 1):
+            return None
         # Check if the net is full connected
         if self.fullyConnected():
             print('Fully connected')
@@ -167,11 +370,11 @@ class Genome:
                         choice.append((node1, node2))
         if len(choice) == 0:
             return None
-        i =  np.random.randint(0,len(choice))
+        i =  rng.choice(len(choice))
         node1, node2 = choice[i]
 
         innovationNumber = self.getInnovationNumber(node1, node2)
-        connection = Connection(node1, node2, 'random', True, innovationNumber)
+        connection = Connection(node1, node2, self.clipWeight(2*rng.random() - 1), True, innovationNumber)
         self.addConnection(connection)
 
     def fullyConnected(self):
@@ -202,7 +405,7 @@ class Genome:
                     return True
 
 
-    def addNodeMutation(self):
+    def addNodeMutation(self, rng = None):
         """
         Add a node to the network
 
@@ -210,8 +413,16 @@ class Genome:
         Make a new node
         Link the starting node to the new node (weight 1)
         Link the new node to the end node (weight connection.weight)
-        """
 
+        Params
+        ----------
+        rng: Random generator (np.random.Generator, default np.random)
+        """
+        if rng is None:
+            rng = np.random
+        # The net can't get bigger than the caps (1 node and 2 connections are added)
+        if not self.withinCaps(hidden = 1, connections = 2):
+            return None
 
         # Make a list from where a connection can be picked
         available = []
@@ -220,12 +431,13 @@ class Genome:
                 available.append(con)
         # If there is no connection to pick, make a new connection instead
         if len(available) == 0:
-            self.addConnectionMutation()
+            self.addConnectionMutation(rng)
             return None
         # If a connection is available : Pick a connection
-        con = np.random.choice(available)
+        con = available[rng.choice(len(available))]
         # Disable it
         con.disable()
+        self.invalidate()
         # Make a new node
         newNode = self.addNode('hidden', number = con.innovationNumber)
         # Link the starting node to the new one
@@ -237,11 +449,48 @@ class Genome:
         newCon2 = Connection(newNode, con.nodeOut, con.weight, True, innovationNumber)
         self.addConnection(newCon2)
 
+    def deleteConnectionMutation(self, rng = None):
+        """
+        Mutation : remove a connection gene from the net (enabled or not)
+        The hidden nodes that are left without any connection are removed too
+
+        Params
+        ----------
+        rng: Random generator (np.random.Generator, default np.random)
+        """
+        if rng is None:
+            rng = np.random
+        if len(self.connectionList) == 0:
+            return None
+        con = self.connectionList.pop(rng.choice(len(self.connectionList)))
+        for node in (con.nodeIn, con.nodeOut):
+            if node.kind == 'hidden' and not any(node in (other.nodeIn, other.nodeOut) for other in self.connectionList):
+                self.nodeList.remove(node)
+        self.invalidate()
+
+    def deleteNodeMutation(self, rng = None):
+        """
+        Mutation : remove a hidden node from the net, with all of its connections
+
+        Params
+        ----------
+        rng: Random generator (np.random.Generator, default np.random)
+        """
+        if rng is None:
+            rng = np.random
+        hidden = self.nodeList[self.sensor + self.output:]
+        if len(hidden) == 0:
+            return None
+        node = hidden[rng.choice(len(hidden))]
+        self.nodeList.remove(node)
+        self.connectionList = [con for con in self.connectionList if node not in (con.nodeIn, con.nodeOut)]
+        self.invalidate()
+
 
     # ------------------------------------------------------------------------------------------------------------------
     # Crossover
     @staticmethod
-    def crossover(parent1, parent2):
+    def crossover(parent1, parent2, rng = None):
         """
         Mate 2 parents (both must have a fitness)
 
@@ -249,7 +498,10 @@ class Genome:
         ----------
         parent1 : (Genome)
         parent2 : (Genome)
+        rng: Random generator (np.random.Generator, default np.random)
         """
+        if rng is None:
+            rng = np.random
         # Order them by fitness
         sameFitness = False
         if parent2.sharedFitness > parent1.sharedFitness:
@@ -259,7 +511,8 @@ class Genome:
 
         # Prepare the child
         sensor = parent1.sensor - parent1.biasActive
-        child = Genome(sensor, parent1.output, bias = parent1.biasActive, initState = 'none')
+        params = dict(parent1.params, bias = parent1.biasActive, initState = 'none')
+        child = Genome(sensor, parent1.output, **params)
         child.sensor = parent1.sensor
         child.output = parent1.output
 
@@ -270,8 +523,8 @@ class Genome:
         # If both parents have the same fitness, it has the same nodes as both of its parents
         if sameFitness:
             for node in parent2.nodeList:
-                # Be sure that the node is not already in the list
-                if node not in child.nodeList:
+                # Be sure that the node is not already in the list (and that there is room for it)
+                if node not in child.nodeList and child.withinCaps(hidden = 1):
                     child.nodeList.append(node)
 
         # Give it connections
@@ -282,13 +535,13 @@ class Genome:
                 if con1.innovationNumber == con2.innovationNumber:
                     # Matching gene
                     # 50% chance to pick the first or the second parent
-                    if np.random.rand() < 0.5:
+                    if rng.random() < 0.5:
                         newCon = copy(con1)
                     else:
                         newCon = copy(con2)
                     if not con1.enabled or not con2.enabled:
                         # If one of the connection is disabled : 75% chance the new connection is disabled
-                        if np.random.rand() < 0.75:
+                        if rng.random() < 0.75:
                             newCon.disable()
                     matches = True
                     break
@@ -298,6 +551,7 @@ class Genome:
             child.connectionList.append(newCon)
         # Have a look at the disjoint and excess genes from parent2 (only if both parents have the same fitness)
         if sameFitness:
+            identifiers = set(node.identifier for node in child.nodeList)
             for con2 in parent2.connectionList:
                 # Be sure it is not a matching gene
                 matches = False
@@ -305,25 +559,29 @@ class Genome:
                     if con1.innovationNumber == con2.innovationNumber:
                         matches = True
                         break
-                if not matches:
+                # Its nodes have to be in the child (the caps can leave some out), and there has to be room for it
+                linked = con2.nodeIn.identifier in identifiers and con2.nodeOut.identifier in identifiers
+                if not matches and linked and child.withinCaps(connections = 1):
                     newCon = copy(con2)
                     child.connectionList.append(newCon)
 
         # Make all the connection refer to the nodes of the child (otherwise, the reference is not shared)
-        for con in child.connectionList:
-            found = 0
-            for node in child.nodeList:
-                if node == con.nodeIn:
-                    con.nodeIn = node
-                    found += 1
-                if node == con.nodeOut:
-                    con.nodeOut = node
-                    found += 1
-                if found == 2:
-                    break
+        child.linkNodes()
 
         return child
 
+    def linkNodes(self):
+        """
+        Make all the connections refer to the nodes of the node list
+        (copying a connection also copies its nodes, so the references have to be shared again)
+        """
+        nodes = {}
+        for node in self.nodeList:
+            nodes[node.identifier] = node
+        for con in self.connectionList:
+            con.nodeIn = nodes.get(con.nodeIn.identifier, con.nodeIn)
+            con.nodeOut = nodes.get(con.nodeOut.identifier, con.nodeOut)
+
 
     # ------------------------------------------------------------------------------------------------------------------
     # Evaluation
@@ -353,7 +611,30 @@ class Genome:
                     Else :
                         Add t to q with a priority of -1
         Reset the 'used' counter
+
+        Nets without recurrent connections always give the same outputs for the same inputs :
+        they are evaluated with the pruned view instead (see prunedView), which gives the same result
+        (and their outputs are memorized if memoSize is given)
         """
+        if not show:
+            if self.memo is not None:
+                key = tuple(inputs)
+                outputs = self.memo.get(key)
+                if outputs is not None:
+                    # Most recently used last
+                    self.memo.move_to_end(key)
+                    self.memoHits += 1
+                    return list(outputs)
+            view = self.prunedView()
+            if not view.recurrent:
+                outputs = view.evaluate(inputs).tolist()
+                if self.memo is not None:
+                    self.memoMisses += 1
+                    self.memo[key] = outputs
+                    if len(self.memo) > self.params['memoSize']:
+                        self.memo.popitem(last = False)
+                    return list(outputs)
+                return outputs
         # Init the input value of the sensors
         for i in range(self.sensor - self.biasActive):
             self.nodeList[i].inputValue = inputs[i]
@@ -414,6 +695,92 @@ class Genome:
         return outputList
 
 
+    def evaluateBatch(self, inputs):
+        """
+        Evaluate the net on a lot of inputs at once
+        Each row gives the same result as evaluate followed by clearNodes
+
+        Params
+        ----------
+        inputs : value of the sensors, one row per evaluation (2D array)
+        """
+        return self.topology().evaluate(inputs, self.weightVector())
+
+    def scoreDataset(self, inputs, targets, loss = 'mse', chunkRows = None):
+        """
+        Fitness of the net on a dataset (batched evaluations, see Loss.py)
+
+        Params
+        ----------
+        inputs : value of the sensors, one row per sample (2D array, can be a np.memmap)
+        targets : expected outputs, one row per sample (2D array, or 1D for a single output)
+        loss : name of the loss ('mse', 'crossEntropy', 'accuracy', 'distance', default 'mse')
+        chunkRows : nb of samples evaluated at once (int, default None : all of them)
+        """
+        phenotype = self.topology()
+        weights = self.weightVector()
+        fitness = streamScore(lambda chunk: phenotype.evaluate(chunk, weights)[None], inputs, targets, loss, chunkRows)
+        return float(fitness[0])
+
+    def topology(self):
+        """
+        Get the compiled topology of the net (shared with all the genomes that have the same topology)
+        Evaluate it with the weights of weightVector
+        """
+        key = self.structureHash()
+        if key != self.phenotypeKey:
+            phenotype = Genome.topologies.get(key)
+            if phenotype is None:
+                phenotype = self.compile(weights = False)
+                Genome.topologies[key] = phenotype
+            self.phenotype = phenotype
+            self.phenotypeKey = key
+        return self.phenotype
+
+    def weightVector(self):
+        """
+        Get the weights of the enabled connections (in the order used by the phenotype)
+        """
+        return np.array([con.weight for con in self.connectionList if con.enabled], dtype=self.dtype)
+
+    def prunedView(self):
+        """
+        Get the pruned evaluation view of the net : only the enabled connections with a weight that isn't 0,
+        and the nodes that are reached from the sensors and reach an output (the genes don't change)
+        It's kept until the next change of the net (see invalidate)
+        It's evaluated in float64 whatever the precision of the genome : evaluate gives the same outputs with or
+        without it (only the weights are stored at the precision of the genome)
+        """
+        if self.view is None:
+            self.view = self.compile(prune = True, dtype = np.float64)
+        return self.view
+
+    def compile(self, weights = True, prune = False, dtype = None):
+        """
+        Make the compiled version of the net (see Phenotype.py)
+
+        Params
+        ----------
+        weights : give it the weights of the net (bool, default True, otherwise it's only the topology)
+        prune : only keep what can change the outputs (bool, default False, see Phenotype)
+        dtype : precision of the evaluations (np.dtype, default None : the precision of the genome)
+        """
+        index = {}
+        for i, node in enumerate(self.nodeList):
+            index[node.identifier] = i
+        sources = []
+        targets = []
+        for connection in self.connectionList:
+            if connection.enabled:
+                sources.append(index[connection.nodeIn.identifier])
+                targets.append(index[connection.nodeOut.identifier])
+        activations = [node.activation for node in self.nodeList]
+        weightList = None
+        if weights:
+            weightList = self.weightVector() if dtype is None else self.weightVector().astype(dtype)
+        return Phenotype(activations, sources, targets, weightList, self.sensor, self.output, self.biasActive,
+                         prune = prune)
+
     def clearNodes(self):
         """
         Clear the input value of the nodes
@@ -445,7 +812,8 @@ class Genome:
         Make a copy of the genome
         """
         sensor = self.sensor - int(self.biasActive)
-        clone = Genome(sensor, self.output, bias = self.biasActive, initState = 'none')
+        params = dict(self.params, bias = self.biasActive, initState = 'none')
+        clone = Genome(sensor, self.output, **params)
         self.sensor = self.sensor
         self.output = self.output
         clone.nodeList = []
@@ -454,17 +822,68 @@ class Genome:
         clone.connectionList = []
         for con in self.connectionList:
             clone.connectionList.append(copy(con))
+        clone.linkNodes()
         clone.rawFitness = self.rawFitness
         clone.sharedFitness = self.sharedFitness
+        # Same genes, same outputs (a champion that goes through keeps its memorized outputs)
+        if self.memo is not None:
+            clone.memo = OrderedDict(self.memo)
         return clone
 
 
+    # ------------------------------------------------------------------------------------------------------------------
+    # Structure
+    def structureHash(self):
+        """
+        Get a hash of the topology of the net (nodes and enabled connections, but not the weights)
+        Two genomes with the same topology have the same hash (it's the same in every process)
+        It's kept until the next change of the net (see invalidate)
+        """
+        if self.structureKey is None:
+            nodes = tuple((node.identifier, node.kind, node.activation) for node in self.nodeList)
+            connections = tuple((con.innovationNumber, con.nodeIn.identifier, con.nodeOut.identifier)
+                                for con in self.connectionList if con.enabled)
+            self.structureKey = hashlib.sha1(repr((nodes, connections)).encode()).hexdigest()
+        return self.structureKey
+
+    def genomeHash(self):
+        """
+        Get a hash of the whole net (topology and weights of the enabled connections)
+        Two genomes with the same hash give the same outputs
+        """
+        weights = [con.weight for con in self.connectionList if con.enabled]
+        return hashlib.sha1(repr((self.structureHash(), weights)).encode()).hexdigest()
+
     # ------------------------------------------------------------------------------------------------------------------
     # Drawing
-    def draw(self):
+    def draw(self, view = True, pruned = False):
         """
         Draw the net
+
+        Params
+        ----------
+        view : open the drawing once it's rendered (bool, default True)
+        pruned : only draw the nodes that can change the outputs (bool, default False, see prunedView)
+        """
+        graph = self.graph(pruned)
+        # Finally, draw it !
+        graph.render(view = view)
+        return graph
+
+    def graph(self, pruned = False):
         """
+        Make the graphviz graph of the net (nothing is rendered)
+
+        Params
+        ----------
+        pruned : only draw the nodes that can change the outputs (bool, default False, see prunedView)
+        """
+        # Drawing is optional : graphviz is only needed here
+        from graphviz import Digraph
+        hidden = set(node.identifier for node in self.nodeList[self.sensor + self.output:])
+        if pruned:
+            live = self.prunedView().live
+            hidden = set(node.identifier for i, node in enumerate(self.nodeList) if live[i] and node.kind == 'hidden')
         # Have a graph
         graph = Digraph('Network', format='svg')
         # Make it go from left to the right
@@ -481,7 +900,7 @@ class Genome:
                 # Output : blue
                 color = "0.66 1 0.5"
                 graph.node(str(node.name), color=color, shape='circle', rank='max', tooltip = str(node.name))
-            else:
+            elif node.identifier in hidden:
                 # Hidden : cyan
                 color = "0.528 1 0.5"
                 graph.node(str(node.name), label = '', color=color, shape='circle', width = '0.3', tooltip = str(node.name))
@@ -494,6 +913,8 @@ class Genome:
             graph.edge(str(self.nodeList[i - 1].name), str(self.nodeList[i].name), style='invis')
         # Prevent hidden nodes to be at the same level as the output nodes
         for node in self.nodeList[self.sensor+self.output:]:
+            if node.identifier not in hidden:
+                continue
             for out in self.nodeList[self.sensor:self.output]:
                 graph.edge(str(node.name), str(out.name), style='invis')
         # Re-align the sensor nodes
@@ -513,6 +934,10 @@ class Genome:
         for connection in self.connectionList:
             # Only draw the enabled ones
             if connection.enabled and connection.weight != 0:
+                if connection.nodeIn.kind == 'hidden' and connection.nodeIn.identifier not in hidden:
+                    continue
+                if connection.nodeOut.kind == 'hidden' and connection.nodeOut.identifier not in hidden:
+                    continue
                 #            if connection.enabled:
                 # Make some fancy colors based on weight
                 if connection.weight < 0:
@@ -524,6 +949,4 @@ class Genome:
                 graph.edge(str(connection.nodeIn.name), str(connection.nodeOut.name), color=color,
                            edgetooltip=str(connection.weight), penwidth=str(abs(connection.weight * 1.5) + 0.2))
 
-        # Finally, draw it !
-        graph.render(view = True)
         return graph
\ No newline at end of file
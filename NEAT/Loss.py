@@ -0,0 +1,181 @@
+import numpy as np
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# A loss is made of 2 functions so that a dataset can be scored piece by piece :
+#   term(outputs, targets) : sum of the loss over a batch, for each genome
+#                            outputs : (nb of genomes, nb of samples, nb of outputs), targets : (nb of samples, nb of outputs)
+#   finish(total, samples, outputs) : fitness from the sum over the whole dataset (the higher the better, never < 0)
+
+def squaredTerm(outputs, targets):
+    """
+    Squared error of each sample (averaged over the outputs)
+    """
+    return np.mean((outputs - targets)**2, axis=2).sum(axis=1)
+
+
+def squaredFinish(total, samples, outputs):
+    """
+    1 / (1 + mean squared error)
+    """
+    return 1 / (1 + total / samples)
+
+
+def crossEntropyTerm(outputs, targets):
+    """
+    Binary cross entropy of each sample (averaged over the outputs, which are taken as probabilities)
+    """
+    # Clip to avoid log(0)
+    outputs = np.clip(outputs, 1e-12, 1 - 1e-12)
+    entropy = -(targets * np.log(outputs) + (1 - targets) * np.log(1 - outputs))
+    return np.mean(entropy, axis=2).sum(axis=1)
+
+
+def crossEntropyFinish(total, samples, outputs):
+    """
+    1 / (1 + mean cross entropy)
+    """
+    return 1 / (1 + total / samples)
+
+
+def accuracyTerm(outputs, targets):
+    """
+    1 for each sample where every output is on the right side of 0.5
+    """
+    return np.all((outputs > 0.5) == (targets > 0.5), axis=2).sum(axis=1)
+
+
+def accuracyFinish(total, samples, outputs):
+    """
+    Part of the samples that are right
+    """
+    return total / samples
+
+
+def distanceTerm(outputs, targets):
+    """
+    Absolute error of each output of each sample
+    """
+    return np.abs(outputs - targets).sum(axis=(1, 2))
+
+
+def distanceFinish(total, samples, outputs):
+    """
+    (nb of values - total absolute error)**2 (the fitness of the original XOR test)
+    """
+    return (samples * outputs - total)**2
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Registry
+# name : (term, finish)
+lossFunctions = {'mse' : (squaredTerm, squaredFinish),
+                 'crossEntropy' : (crossEntropyTerm, crossEntropyFinish),
+                 'accuracy' : (accuracyTerm, accuracyFinish),
+                 'distance' : (distanceTerm, distanceFinish)}
+
+
+def addLoss(name, term, finish):
+    """
+    Register a new loss
+
+    Params
+    ----------
+    name : name used to refer to it (str)
+    term : sum of the loss over a batch, for each genome (func, see above)
+    finish : fitness from the sum over the whole dataset (func, see above)
+    """
+    lossFunctions[name] = (term, finish)
+
+
+def getLoss(name):
+    """
+    Get the (term, finish) functions of a loss
+
+    Params
+    ----------
+    name : name of the loss (str)
+    """
+    try:
+        return lossFunctions[name]
+    except KeyError:
+        raise ValueError('Unknown loss : {}'.format(name))
+
+
+def targetArray(targets):
+    """
+    Targets as a 2D array (one row per sample)
+
+    Params
+    ----------
+    targets : (1D array for a single output, or 2D array)
+    """
+    targets = np.asarray(targets, dtype=float)
+    if targets.ndim == 1:
+        targets = targets.reshape((-1, 1))
+    return targets
+
+
+def score(outputs, targets, loss = 'mse'):
+    """
+    Fitness of each genome on a dataset
+
+    Params
+    ----------
+    outputs : outputs of the genomes (3D array : genome, sample, output)
+    targets : expected outputs (see targetArray)
+    loss : name of the loss (str, default 'mse')
+    """
+    term, finish = getLoss(loss)
+    targets = targetArray(targets)
+    return finish(term(outputs, targets), len(targets), targets.shape[1])
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Datasets that don't fit in memory
+
+def openArray(data):
+    """
+    Open an array of a dataset without loading it : a .npy file is memory-mapped
+
+    Params
+    ----------
+    data : (path of a .npy file, np.memmap, or anything np.asarray understands)
+    """
+    if isinstance(data, str):
+        return np.load(data, mmap_mode='r')
+    if isinstance(data, np.ndarray):
+        return data
+    return np.asarray(data, dtype=float)
+
+
+def streamScore(evaluate, inputs, targets, loss = 'mse', chunkRows = None, rows = None):
+    """
+    Fitness of each genome on a dataset, read chunk by chunk (only one chunk is in memory at once)
+
+    Params
+    ----------
+    evaluate : outputs of the genomes for a chunk of inputs (func : 2D array -> 3D array : genome, sample, output)
+    inputs : value of the sensors, one row per sample (2D array, can be a np.memmap)
+    targets : expected outputs, one row per sample (2D array, or 1D for a single output, can be a np.memmap)
+    loss : name of the loss (str, default 'mse')
+    chunkRows : nb of samples per chunk (int, default None : everything at once)
+    rows : samples used, in increasing order (int np.array, default None : all of them)
+    """
+    term, finish = getLoss(loss)
+    count = len(inputs) if rows is None else len(rows)
+    if chunkRows is None:
+        chunkRows = max(count, 1)
+    total = 0
+    for start in range(0, count, chunkRows):
+        if rows is None:
+            chunkInputs = inputs[start:start + chunkRows]
+            chunkTargets = targets[start:start + chunkRows]
+        else:
+            chunkInputs = inputs[rows[start:start + chunkRows]]
+            chunkTargets = targets[rows[start:start + chunkRows]]
+        chunkTargets = targetArray(chunkTargets)
+        outputs = evaluate(np.atleast_2d(np.asarray(chunkInputs)))
+        total = total + term(outputs, chunkTargets)
+    outputCount = 1 if np.ndim(targets) == 1 else np.shape(targets)[1]
+    return finish(total, count, outputCount)
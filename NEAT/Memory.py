@@ -0,0 +1,116 @@
+import gc
+import sys
+import tracemalloc
+
+
+class MemoryReport:
+    """
+    Memory accounting of a population, generation after generation
+    Each record is a dict :
+        gen : the gen (int)
+        objects : {class name : {'count' : nb of live objects, 'bytes' : approximate size}}
+        speciesTable : size of the species table (bytes)
+        speciesHistory : nb of species in the history
+        hallOfFame : nb of genomes in the memory of the hall of fame
+        innovations : nb of innovations in the innovation history
+        newPop : top allocation sites while the new pop was made ({'file', 'line', 'size', 'count'} list)
+        peak : peak of the memory traced while the new pop was made (bytes, since the tracing started on Python 3.8)
+    """
+
+    # Classes that are counted
+    classes = ('Genome', 'Node', 'Connection', 'History', 'Species')
+
+    def __init__(self, every = 1, top = 10, trace = True):
+        """
+        Make a new report
+
+        Params
+        ----------
+        every : only one gen out of 'every' is measured (int, default 1)
+                Counting goes through all the objects of the interpreter and tracing slows newPop down,
+                so a high value keeps the cost low on long runs
+        top : nb of allocation sites kept (int, default 10)
+        trace : trace the allocations of newPop with tracemalloc (bool, default True)
+        """
+        self.every = every
+        self.top = top
+        self.trace = trace
+        self.records = []
+        self.before = None  # Snapshot taken before newPop
+        self.tracing = False  # Did we start tracemalloc ourselves ?
+
+    def __repr__(self):
+        """
+        Defines how a report is shown in console
+        """
+        text = 'MemoryReport - {} records - every {} gen'.format(len(self.records), self.every)
+        return '<{}>'.format(text)
+
+    def sampled(self, gen):
+        """
+        Tell if a gen is measured
+
+        Params
+        ----------
+        gen : (int)
+        """
+        return gen % self.every == 0
+
+    def count(self):
+        """
+        Count the live objects of each class and their approximate size (the object and its attributes dict)
+        """
+        objects = {}
+        for name in MemoryReport.classes:
+            objects[name] = {'count' : 0, 'bytes' : 0}
+        for obj in gc.get_objects():
+            name = type(obj).__name__
+            if name in objects:
+                objects[name]['count'] += 1
+                objects[name]['bytes'] += sys.getsizeof(obj) + sys.getsizeof(getattr(obj, '__dict__', None))
+        return objects
+
+    def start(self):
+        """
+        Start tracing the allocations (called before newPop)
+        """
+        if not self.trace:
+            return
+        self.tracing = not tracemalloc.is_tracing()
+        if self.tracing:
+            tracemalloc.start()
+        # Python 3.8 can't reset the peak : it's the peak since the tracing started
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        self.before = tracemalloc.take_snapshot()
+
+    def stop(self, population):
+        """
+        Stop tracing and record the gen (called after newPop)
+
+        Params
+        ----------
+        population : (Population)
+        """
+        record = {'gen' : population.gen - 1,
+                  'newPop' : [],
+                  'peak' : None}
+        if self.trace and self.before is not None:
+            after = tracemalloc.take_snapshot()
+            record['peak'] = tracemalloc.get_traced_memory()[1]
+            if self.tracing:
+                tracemalloc.stop()
+            for stat in after.compare_to(self.before, 'lineno')[:self.top]:
+                frame = stat.traceback[0]
+                record['newPop'].append({'file' : frame.filename,
+                                         'line' : frame.lineno,
+                                         'size' : stat.size_diff,
+                                         'count' : stat.count_diff})
+            self.before = None
+        record['objects'] = self.count()
+        record['speciesTable'] = population.speciesTable.nbytes
+        record['speciesHistory'] = len(population.speciesHistory)
+        record['hallOfFame'] = len(population.hallOfFame)
+        record['innovations'] = len(population.genomeList[0].innovationHistory) if population.genomeList else 0
+        self.records.append(record)
+        return record
@@ -0,0 +1,156 @@
+import os
+import threading
+
+
+class Metrics:
+    """
+    Export the metrics of a population in the Prometheus text format
+    (to a file, or from a local HTTP endpoint)
+
+    The population only hands over a dict of numbers at the end of each gen,
+    the text is made and written (or served) by a background thread
+    """
+
+    # name -> (type, help)
+    description = {'neat_generation' : ('gauge', 'Current generation'),
+                   'neat_generations_total' : ('counter', 'Nb of generations made'),
+                   'neat_generation_seconds' : ('gauge', 'Duration of the last generation'),
+                   'neat_generation_rate' : ('gauge', 'Generations per second (last generation)'),
+                   'neat_evaluations_total' : ('counter', 'Nb of fitness evaluations'),
+                   'neat_evaluations_per_second' : ('gauge', 'Fitness evaluations per second (last generation)'),
+                   'neat_phase_seconds' : ('gauge', 'Duration of each phase of the last generation'),
+                   'neat_species' : ('gauge', 'Nb of living species'),
+                   'neat_species_comparisons' : ('gauge', 'Nb of genome / species comparisons of the last speciation'),
+                   'neat_compatibility_threshold' : ('gauge', 'Compatibility threshold of the speciation'),
+                   'neat_best_fitness' : ('gauge', 'Raw fitness of the best genome ever'),
+                   'neat_average_fitness' : ('gauge', 'Average raw fitness of the last generation'),
+                   'neat_mean_genome_nodes' : ('gauge', 'Mean nb of nodes of a genome'),
+                   'neat_mean_genome_connections' : ('gauge', 'Mean nb of connections of a genome'),
+                   'neat_innovations' : ('gauge', 'Nb of innovations in the innovation history'),
+                   'neat_memo_hit_rate' : ('gauge', 'Part of the evaluations answered by the memorized outputs')}
+
+    def __init__(self, path = None, port = None, host = '127.0.0.1'):
+        """
+        Make a new exporter
+
+        Params
+        ----------
+        path : file where the metrics are written after each gen (str, default None)
+               The file is replaced atomically, so it can be read by node_exporter's textfile collector
+        port : port of the HTTP endpoint (int, default None : no endpoint, 0 : any free port)
+        host : address the endpoint listens on (str, default '127.0.0.1')
+        """
+        self.path = path
+        self.values = {}
+        self.lock = threading.Lock()
+        self.changed = threading.Event()
+        self.errors = []  # Exceptions raised while writing the file
+        self.closing = False  # Set by close : the writer writes the last values and stops
+        # File : a daemon thread writes the file when new values come
+        self.writer = None
+        if path is not None:
+            self.writer = threading.Thread(target = self.work, daemon = True)
+            self.writer.start()
+        # Endpoint : a daemon thread serves the last values
+        self.server = None
+        if port is not None:
+            # http.server is only imported when an endpoint is wanted
+            from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+            metrics = self
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    data = metrics.text().encode()
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                    self.send_header('Content-Length', str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+
+                def log_message(self, *args):
+                    # Don't print every request
+                    pass
+
+            self.server = ThreadingHTTPServer((host, port), Handler)
+            self.port = self.server.server_address[1]
+            threading.Thread(target = self.server.serve_forever, daemon = True).start()
+
+    def __repr__(self):
+        """
+        Defines how an exporter is shown in console
+        """
+        where = []
+        if self.path is not None:
+            where.append(self.path)
+        if self.server is not None:
+            where.append('port {}'.format(self.port))
+        text = 'Metrics - {}'.format(' - '.join(where) if where else 'no output')
+        return '<{}>'.format(text)
+
+    def update(self, values):
+        """
+        Give the values of the last gen (returns right away)
+
+        Params
+        ----------
+        values : metric name -> value, or {label : value} for the labelled ones (dict)
+        """
+        with self.lock:
+            self.values = values
+        self.changed.set()
+
+    def text(self):
+        """
+        The last values in the Prometheus text format
+        """
+        with self.lock:
+            values = self.values
+        lines = []
+        for name, value in values.items():
+            kind, help = Metrics.description.get(name, ('gauge', name))
+            lines.append('# HELP {} {}'.format(name, help))
+            lines.append('# TYPE {} {}'.format(name, kind))
+            if isinstance(value, dict):
+                for label, v in value.items():
+                    lines.append('{}{{phase="{}"}} {}'.format(name, label, float(v)))
+            else:
+                lines.append('{} {}'.format(name, float(value)))
+        return '\n'.join(lines) + '\n'
+
+    def work(self):
+        """
+        Loop of the thread that writes the file
+        """
+        while True:
+            self.changed.wait()
+            self.changed.clear()
+            try:
+                self.write()
+            except Exception as exception:
+                # We don't want a full disk to kill the thread
+                self.errors.append(exception)
+            if self.closing:
+                return
+
+    def write(self):
+        """
+        Write the file (atomically : it's written next to it then renamed)
+        """
+        temp = self.path + '.tmp'
+        with open(temp, 'w') as file:
+            file.write(self.text())
+        os.replace(temp, self.path)
+
+    def close(self):
+        """
+        Stop the endpoint, and the writer once the last values are written
+        """
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        if self.writer is not None:
+            self.closing = True
+            self.changed.set()
+            self.writer.join()
+            self.writer = None
@@ -1,20 +1,9 @@
-from math import e
-
-
-def activationFunction(x):
-    """
-    Activation function used to evaluate a Node
-
-    Params
-    ----------
-    x : (value)
-    """
-    return 1 / (1+e**(-4.9*x))
+from .Activation import getActivation
 
 
 class Node:
 
-    def __init__(self, identifier, kind='hidden', name = None):
+    def __init__(self, identifier, kind='hidden', name = None, activation = 'sigmoid'):
         """
         Create a new node
 
@@ -23,10 +12,13 @@ class Node:
         number ((int, int)) : The id of the node
         kind (str) : Can be 'sensor', 'hidden', 'output'
         name (str) : name of the node
+        activation (str) : name of the activation function of the node (see Activation.py)
         """
         self.identifier = identifier
         self.number = identifier[0]
         self.kind = kind
+        # Activation gene
+        self.activation = activation
         # Value used by evaluation
         self.inputValue = 0
         self.outputValue = 0
@@ -59,7 +51,7 @@ class Node:
         """
         Evaluate the node (edit it's output value)
         """
-        self.outputValue = activationFunction(self.inputValue)
+        self.outputValue = getActivation(self.activation)[0](self.inputValue)
         # Reset the input value
         self.inputValue = 0
 
@@ -69,5 +61,5 @@ class Node:
         """
         Copy the node
         """
-        clone = Node(self.identifier, self.kind, self.name)
+        clone = Node(self.identifier, self.kind, self.name, self.activation)
         return clone
\ No newline at end of file
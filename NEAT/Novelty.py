@@ -0,0 +1,114 @@
+import numpy as np
+
+
+class BehaviourArchive:
+    """
+    Archive of behaviours used by novelty search
+    The novelty of a genome is its sparseness : its average distance to its k nearest neighbours
+    (amongst the current population and the archive)
+    """
+
+    def __init__(self, size = 500, k = 15, policy = 'threshold', threshold = 1.0, probability = 0.05, rng = None):
+        """
+        Make a new archive
+
+        Params
+        ----------
+        size : max nb of behaviours kept, the oldest ones are replaced first (int, default 500)
+        k : nb of neighbours used by the sparseness (int, default 15)
+        policy : how behaviours get in the archive (str, default 'threshold')
+                 'threshold' : the ones more novel than a threshold (that adapts itself)
+                 'random' : each behaviour has the same probability to get in
+                 'best' : the most novel one of each gen
+        threshold : starting threshold of the 'threshold' policy (float, default 1.0)
+        probability : probability of the 'random' policy (float, default 0.05)
+        rng : Random generator of the 'random' policy (np.random.Generator, default np.random)
+        """
+        self.size = size
+        self.k = k
+        self.policy = policy
+        self.threshold = threshold
+        self.probability = probability
+        self.rng = np.random if rng is None else rng
+        self.behaviours = None  # Allocated once we know the size of a behaviour
+        self.count = 0  # Nb of behaviours in the archive
+        self.next = 0  # Where the next behaviour goes
+        self.stale = 0  # Nb of gens without insertion (used by the 'threshold' policy)
+        # Max nb of rows of the distance matrix computed at once
+        self.chunkSize = 1024
+
+    def __repr__(self):
+        """
+        Defines how an archive is shown in console
+        """
+        text = 'BehaviourArchive - {}/{} behaviours - {}'.format(self.count, self.size, self.policy)
+        return '<{}>'.format(text)
+
+    def __len__(self):
+        return self.count
+
+    def sparseness(self, behaviours):
+        """
+        Get the sparseness of each behaviour of the population
+
+        Params
+        ----------
+        behaviours : one behaviour per row (2D np.array)
+        """
+        behaviours = np.asarray(behaviours, dtype=float)
+        if self.count:
+            reference = np.concatenate((behaviours, self.behaviours[:self.count]))
+        else:
+            reference = behaviours
+        k = min(self.k, len(reference) - 1)
+        if k < 1:
+            return np.zeros(len(behaviours))
+        referenceNorm = np.sum(reference**2, axis=1)
+        sparseness = np.empty(len(behaviours))
+        # Work on a few rows at once so that the distance matrix stays small
+        for start in range(0, len(behaviours), self.chunkSize):
+            rows = behaviours[start:start + self.chunkSize]
+            squared = np.sum(rows**2, axis=1)[:, None] + referenceNorm[None, :] - 2 * rows @ reference.T
+            distance = np.sqrt(np.maximum(squared, 0))
+            # A behaviour is not its own neighbour
+            index = np.arange(len(rows))
+            distance[index, start + index] = np.inf
+            nearest = np.partition(distance, k - 1, axis=1)[:, :k]
+            sparseness[start:start + len(rows)] = nearest.mean(axis=1)
+        return sparseness
+
+    def insert(self, behaviours, sparseness):
+        """
+        Put some of the behaviours of the population in the archive (according to the policy)
+
+        Params
+        ----------
+        behaviours : one behaviour per row (2D np.array)
+        sparseness : sparseness of each behaviour (np.array)
+        """
+        behaviours = np.asarray(behaviours, dtype=float)
+        if self.policy == 'threshold':
+            chosen = np.nonzero(sparseness > self.threshold)[0]
+            # Make the threshold follow the novelty of the population
+            if len(chosen) > 4:
+                self.threshold *= 1.2
+            if len(chosen) == 0:
+                self.stale += 1
+                if self.stale >= 5:
+                    self.threshold *= 0.95
+            else:
+                self.stale = 0
+        elif self.policy == 'random':
+            chosen = np.nonzero(self.rng.random(len(behaviours)) < self.probability)[0]
+        elif self.policy == 'best':
+            chosen = np.array([np.argmax(sparseness)])
+        else:
+            raise ValueError('Unknown archive policy : {}'.format(self.policy))
+
+        if self.behaviours is None:
+            self.behaviours = np.zeros((self.size, behaviours.shape[1]))
+        # It's a ring : the oldest behaviours are replaced first
+        for i in chosen[-self.size:]:
+            self.behaviours[self.next] = behaviours[i]
+            self.next = (self.next + 1) % self.size
+            self.count = min(self.count + 1, self.size)
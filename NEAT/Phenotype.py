@@ -0,0 +1,317 @@
+import numpy as np
+from .Activation import getActivation
+
+
+class Phenotype:
+    """
+    Compiled version of a genome, used to evaluate a whole batch of inputs at once
+    """
+
+    # Above this nb of connections, the layers are evaluated with sparse matrices (CSR) instead of dense ones
+    sparseThreshold = 1000
+
+    def __init__(self, activations, sources, targets, weights, sensor, output, bias, engine = None, prune = False):
+        """
+        Compile a net
+
+        Params
+        ----------
+        activations : activation of each node, in the order of the node list (str list)
+        sources : index of the starting node of each enabled connection (int list)
+        targets : index of the ending node of each enabled connection (int list)
+        weights : weight of each enabled connection (float list or np.array, None : the phenotype is only a topology
+                  shared by several genomes, the weights are given to evaluate)
+                  The evaluations are made at the precision of the weights (float64 for a list)
+        sensor : nb of sensor nodes (bias included) (int)
+        output : nb of output nodes (int)
+        bias : is the last sensor a bias ? (bool)
+        engine : 'dense' or 'sparse' (str, default None : chosen with Phenotype.sparseThreshold)
+        prune : only keep the nodes that reach an output, and the connections with a weight that isn't 0
+                (bool, default False). The order of evaluation is still the one of the whole net, so the outputs
+                are the same
+        """
+        self.sensor = sensor
+        self.output = output
+        self.bias = bias
+        self.size = len(activations)
+        self.sources = np.array(sources, dtype=int)
+        self.targets = np.array(targets, dtype=int)
+
+        # Find the order in which Genome.evaluate goes through the nodes
+        self.order = self.evaluationOrder()
+        position = np.full(self.size, -1)
+        position[self.order] = np.arange(len(self.order))
+
+        # Only the connections going from a node to a node evaluated later are used
+        # The others ('late' connections) are the recurrent ones : they would only be used by the next evaluation
+        evaluated = position[self.sources] >= 0
+        used = evaluated & (position[self.sources] < position[self.targets])
+        self.recurrent = bool(np.any(evaluated & ~used))
+        self.used = np.nonzero(used)[0]
+
+        # Put the nodes in layers : a node only depends on the nodes of the previous layers
+        incoming = [[] for i in range(self.size)]
+        for edge in self.used:
+            incoming[self.targets[edge]].append(self.sources[edge])
+        layer = np.zeros(self.size, dtype=int)
+        for node in self.order:
+            if node >= sensor:
+                layer[node] = max(layer[feeder] for feeder in incoming[node]) + 1
+
+        # Pruned view : drop what can't change the outputs (the layers are the ones of the whole net)
+        self.live = np.zeros(self.size, dtype=bool)  # Nodes that are evaluated
+        self.live[self.order] = True
+        if prune:
+            if weights is not None:
+                self.used = self.used[np.asarray(weights)[self.used] != 0]
+            self.live &= self.reachOutputs(self.used)
+            self.used = self.used[self.live[self.targets[self.used]]]
+        if engine is None:
+            engine = 'sparse' if len(self.used) > Phenotype.sparseThreshold else 'dense'
+        self.engine = engine
+
+        # Group the nodes and the connections by layer (the connections go with the node they go to)
+        hidden = np.sort(self.order[self.live[self.order] & (self.order >= sensor)])
+        sortedNodes = hidden[np.argsort(layer[hidden], kind='stable')]
+        nodeBounds = np.searchsorted(np.sort(layer[hidden]), np.arange(1, layer.max() + 2))
+        edgeLayer = layer[self.targets[self.used]]
+        sortedEdges = self.used[np.argsort(edgeLayer, kind='stable')]
+        edgeBounds = np.searchsorted(np.sort(edgeLayer), np.arange(1, layer.max() + 2))
+        self.layers = []
+        for depth in range(1, layer.max() + 1):
+            nodes = sortedNodes[nodeBounds[depth-1]:nodeBounds[depth]]
+            edges = sortedEdges[edgeBounds[depth-1]:edgeBounds[depth]]
+            if len(nodes) == 0:
+                # Everything in it has been pruned
+                continue
+            # The connections are sorted by the node they go to (CSR rows, used by the sparse engine)
+            column = np.searchsorted(nodes, self.targets[edges])
+            edges = edges[np.argsort(column, kind='stable')]
+            column = np.sort(column)
+            feeders = np.unique(self.sources[edges])
+            start = np.searchsorted(column, np.arange(len(nodes)))
+            self.layers.append({'nodes' : nodes,
+                                'feeders' : feeders,
+                                'edges' : edges,
+                                # Position of each connection in the weight matrix of the layer
+                                'row' : np.searchsorted(feeders, self.sources[edges]),
+                                'column' : column,
+                                # Where the connections of each node start (CSR row pointers)
+                                'start' : start,
+                                # Nodes without any connection left (only after pruning)
+                                'empty' : np.diff(np.append(start, len(edges))) == 0,
+                                'groups' : self.groupByActivation(nodes, activations)})
+        self.sensorGroups = self.groupByActivation(np.arange(sensor), activations)
+        self.weights = None
+        self.matrices = None
+        if weights is not None:
+            self.setWeights(weights)
+
+    def __repr__(self):
+        """
+        Defines how a phenotype is shown in console
+        """
+        text = 'Phenotype - {} nodes - {} connections - {} layers - {}'.format(self.size, len(self.used),
+                                                                            len(self.layers), self.engine)
+        return '<{}>'.format(text)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Compilation
+    def evaluationOrder(self):
+        """
+        Get the order in which the nodes are evaluated by Genome.evaluate
+        (same algorithm, with one queue per priority so that it stays fast on big nets)
+        """
+        outgoing = [[] for i in range(self.size)]
+        missing = np.zeros(self.size, dtype=int)  # Nb of feeders of a node that haven't been used yet
+        for source, target in zip(self.sources, self.targets):
+            outgoing[source].append(target)
+            missing[target] += 1
+        # One queue per priority (dicts keep the insertion order)
+        queues = {1: {}, 0: {}, -1: {}}
+        where = {}
+        for node in range(self.sensor):
+            queues[0][node] = None
+            where[node] = 0
+        activated = np.zeros(self.size, dtype=bool)
+        order = []
+        while where:
+            # Highest priority first, the oldest one if there is a tie
+            priority = next(p for p in (1, 0, -1) if queues[p])
+            node = next(iter(queues[priority]))
+            del queues[priority][node]
+            del where[node]
+            activated[node] = True
+            order.append(node)
+            for target in outgoing[node]:
+                missing[target] -= 1
+            for target in outgoing[node]:
+                if not activated[target]:
+                    if target in where:
+                        del queues[where[target]][target]
+                    where[target] = 1 if missing[target] == 0 else -1
+                    queues[where[target]][target] = None
+        return np.array(order, dtype=int)
+
+    def reachOutputs(self, edges):
+        """
+        Find the nodes that have a path to an output
+
+        Params
+        ----------
+        edges : the connections that can be used (int np.array)
+        """
+        incoming = [[] for i in range(self.size)]
+        for edge in edges:
+            incoming[self.targets[edge]].append(self.sources[edge])
+        reach = np.zeros(self.size, dtype=bool)
+        stack = list(range(self.sensor, self.sensor + self.output))
+        reach[stack] = True
+        while stack:
+            node = stack.pop()
+            for feeder in incoming[node]:
+                if not reach[feeder]:
+                    reach[feeder] = True
+                    stack.append(feeder)
+        return reach
+
+    @staticmethod
+    def groupByActivation(nodes, activations):
+        """
+        Group nodes that have the same activation (each group is evaluated in one vectorized call)
+
+        Params
+        ----------
+        nodes : index of the nodes (np.array)
+        activations : activation of every node of the net (str list)
+        """
+        groups = {}
+        for i, node in enumerate(nodes):
+            groups.setdefault(activations[node], []).append(i)
+        return [(getActivation(name)[1], np.array(local)) for name, local in groups.items()]
+
+    def setWeights(self, weights):
+        """
+        Give its own weights to the phenotype (used when evaluate is called without weights)
+
+        Params
+        ----------
+        weights : weight of each enabled connection (float list or np.array)
+        """
+        self.weights = Phenotype.weightArray(weights)
+        self.matrices = self.layerMatrices(self.weights[None])
+
+    @staticmethod
+    def weightArray(weights):
+        """
+        Weights as a float array (the precision of a float array is kept)
+
+        Params
+        ----------
+        weights : (float list or np.array)
+        """
+        weights = np.asarray(weights)
+        if not np.issubdtype(weights.dtype, np.floating):
+            weights = weights.astype(float)
+        return weights
+
+    def layerMatrices(self, weights):
+        """
+        Build the weight matrix of every layer for a stack of weight vectors
+        (dense matrices, or the values of the CSR matrices for the sparse engine)
+        The matrices have the precision of the weights
+
+        Params
+        ----------
+        weights : one weight vector per row (2D np.array)
+        """
+        matrices = []
+        for layer in self.layers:
+            if self.engine == 'sparse':
+                matrices.append(weights[:, None, layer['edges']])
+            else:
+                matrix = np.zeros((len(weights), len(layer['feeders']), len(layer['nodes'])), dtype=weights.dtype)
+                np.add.at(matrix, (slice(None), layer['row'], layer['column']), weights[:, layer['edges']])
+                matrices.append(matrix)
+        return matrices
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Evaluation
+    def evaluate(self, inputs, weights = None):
+        """
+        Evaluate the net on a batch of inputs
+        Every row is evaluated on its own, from cleared nodes (as Genome.evaluate followed by Genome.clearNodes)
+
+        Params
+        ----------
+        inputs : value of the sensors, one row per evaluation (2D array, or a single list of values)
+        weights : weight of each enabled connection (float list, default : the ones of the phenotype)
+        """
+        if weights is None:
+            matrices = self.matrices
+        else:
+            weights = Phenotype.weightArray(weights)
+            matrices = self.layerMatrices(weights[None])
+        return self.propagate(inputs, matrices, 1, self.weights.dtype if weights is None else weights.dtype)[0]
+
+    def evaluateStack(self, inputs, weights):
+        """
+        Evaluate several nets that have this topology at once (one weight vector per net)
+
+        Params
+        ----------
+        inputs : value of the sensors, the same for every net (2D array, or a single list of values)
+                 or one batch per net (3D array)
+        weights : one weight vector per net (2D array)
+        """
+        weights = np.atleast_2d(Phenotype.weightArray(weights))
+        return self.propagate(inputs, self.layerMatrices(weights), len(weights), weights.dtype)
+
+    def propagate(self, inputs, matrices, count, dtype = float):
+        """
+        Propagate the inputs through the layers
+
+        Params
+        ----------
+        inputs : value of the sensors (1D, 2D or 3D array, see evaluateStack)
+        matrices : weight matrices of the layers (see layerMatrices)
+        count : nb of nets evaluated at once (int)
+        dtype : precision of the evaluation, the one of the matrices (np.dtype, default float64)
+        """
+        inputs = np.asarray(inputs, dtype=dtype)
+        single = inputs.ndim == 1
+        if inputs.ndim < 3:
+            inputs = np.atleast_2d(inputs)
+            inputs = np.broadcast_to(inputs, (count,) + inputs.shape)
+        values = np.zeros(inputs.shape[:2] + (self.size,), dtype=dtype)
+        # Sensors
+        values[:, :, :self.sensor - self.bias] = inputs
+        if self.bias:
+            values[:, :, self.sensor - 1] = 1
+        for function, local in self.sensorGroups:
+            values[:, :, local] = function(values[:, :, local])
+        # Then each layer, one after the other
+        for layer, matrix in zip(self.layers, matrices):
+            if self.engine == 'sparse':
+                # Sparse mat-vec : every node adds up the values of its own connections
+                if len(layer['edges']) == 0:
+                    total = np.zeros(values.shape[:2] + (len(layer['nodes']),), dtype=dtype)
+                else:
+                    products = values[:, :, self.sources[layer['edges']]] * matrix
+                    if layer['empty'].any():
+                        # Only a pruned net has nodes without connections (reduceat doesn't give 0 for them)
+                        products = np.concatenate((products, np.zeros(products.shape[:2] + (1,), dtype=dtype)), axis=2)
+                        total = np.add.reduceat(products, layer['start'], axis=2)
+                        total[:, :, layer['empty']] = 0
+                    else:
+                        total = np.add.reduceat(products, layer['start'], axis=2)
+            else:
+                total = values[:, :, layer['feeders']] @ matrix
+            for function, local in layer['groups']:
+                values[:, :, layer['nodes'][local]] = function(total[:, :, local])
+
+        # Output nodes that can't be reached stay at 0
+        outputs = values[:, :, self.sensor:self.sensor + self.output]
+        if single:
+            return outputs[:, 0]
+        return outputs
@@ -1,8 +1,21 @@
-from Genome import Genome
-from Species import Species
+from .Genome import Genome
+from .Species import Species
+from .History import History
+from .Node import Node
+from .Reproduction import reproduce, mergeInnovations
+from .Archive import GenerationLog, HallOfFame
+from .Renderer import Renderer
+from .Novelty import BehaviourArchive
+from .Racing import Racing
+from .Memory import MemoryReport
+from .Metrics import Metrics
+from .Loss import streamScore, openArray
+from .Checkpoint import Checkpointer, packGenomes, unpackGenomes, load
+from .Transport import SharedPopulation, evaluateSlice
+from .Scheduler import Scheduler
 import numpy as np
+import time
 from copy import copy
-import matplotlib.pyplot as plt
 
 class Population:
 
@@ -18,8 +31,81 @@ class Population:
         bias : Whether we have a bias or not (bool, default True)
         initState : How are the nets at init ? ('one link', 'all linked', default 'one link')
         fitness : The fitness function of the genomes (func)
+        dataset : If given, the fitness is the score on this dataset (inputs, targets), see Loss.py
+                  (tuple of 2D arrays, np.memmap or paths of .npy files, default None : fitness is used)
+        loss : Loss used to score the dataset ('mse', 'crossEntropy', 'accuracy', 'distance', default 'mse')
+        phenotypeFitness : If given, the fitness is computed from the compiled genomes (see Phenotype), by the workers
+                           that read the genes from shared memory, see evaluateShared
+                           (func : phenotype -> fitness, defined at the top of a module, default None)
+        chunkRows : Nb of samples of the dataset evaluated at once, bounds the memory used by the evaluation
+                    (int, default 4096)
+        minibatch : If given, each gen is scored on this nb of samples, drawn at random (int, default None : all)
         sensorName : Name of the sensors (str list)
         outputName : Name of the outputs (str list)
+        c1, c2, c3 : Constants of the distance between genomes : excess genes, disjoint genes, avg. weight diff.
+                     (float, default 1.0, 1.0, 0.4)
+        threshold : Max distance between a genome and the mascot of its species (float, default 3)
+        targetSpecies : If given, the threshold changes after each gen to get closer to this nb of species
+                        (int, default None : the threshold doesn't change)
+        thresholdStep : How much the threshold changes after each gen (float, default 0.3)
+        thresholdMin : The threshold never gets below this value (float, default 0.3)
+        sensorActivation : Activation function of the sensors (str, default 'sigmoid', see Activation.py)
+        hiddenActivation : Activation function of the hidden nodes (str, default 'sigmoid')
+        outputActivation : Activation function of the outputs (str, default 'sigmoid')
+        precision : Precision of the weights and of the batch evaluations, evaluate stays in float64
+                    ('float64', 'float32', default 'float64')
+                    float32 halves the memory traffic of big batch evaluations
+        maxHidden : Max nb of hidden nodes of a genome (int, default None : no limit)
+        maxConnections : Max nb of connection genes of a genome, disabled ones included (int, default None : no limit)
+        deleteConnectionRate : Probability of the delete connection mutation (float, default 0)
+        deleteNodeRate : Probability of the delete node mutation (float, default 0)
+        memoSize : If given, each genome keeps the outputs of its last 'memoSize' different inputs
+                   (nets without recurrent connections only), see memoStats (int, default None)
+        complexityPenalty : Taken from the raw fitness of a genome before it's shared
+                            (float : penalty per hidden node and enabled connection,
+                             or func : genome -> penalty, default None : no penalty)
+        historySize : Nb of generations for which we keep everything (speciesTable, extinct species)
+                      (int, default None : keep all of them, otherwise only compact summaries are kept)
+        historyFile : File where the summaries that get out of the memory are written (str, default None)
+        hallOfFame : Nb of genomes kept in memory by the hall of fame (int, default 10)
+        hallOfFameFile : File where the genomes pushed out of the hall of fame are written, see HallOfFame.top
+                         (str, default None : they are forgotten)
+        renderDirectory : If given, the champion of each gen is rendered in this directory, in the background
+                          (str, default None)
+        seed : Seed of the random generators used to make the new gens (int, default None : taken from np.random)
+        workers : Nb of processes used to make the children (int, default None : everything is done in this one)
+        chunkSize : Nb of children made by each job (int, default 25)
+                    For a given seed, the result doesn't depend on the nb of workers
+        pipeline : If True, the children are sent to be evaluated as soon as a job has made them, and the speciation
+                   goes through the genomes that have their fitness while the others are still evaluated
+                   (only with fitness or phenotypeFitness, and with workers fitness has to be defined at the top of a
+                   module). The gens are the same as without it (bool, default False)
+        behaviour : If given, novelty search is used : the raw fitness of a genome is the novelty of its behaviour
+                    (func : genome -> behaviour vector, default None)
+        noveltyK : Nb of neighbours used to compute the novelty (int, default 15)
+        archiveSize : Max nb of behaviours in the archive (int, default 500)
+        archivePolicy : How behaviours get in the archive ('threshold', 'random', 'best', default 'threshold')
+        noveltyThreshold : Starting threshold of the 'threshold' policy (float, default 1.0)
+        archiveProbability : Probability of the 'random' policy (float, default 0.05)
+        episodeFitness : If given, the fitness is the average score of several episodes, scheduled by racing
+                         (func : (genome, rng) -> score of one episode, default None : fitness is used)
+        episodes : Max nb of episodes played by a genome (int, default 20)
+        firstEpisodes : Nb of episodes played by every genome (int, default 2)
+        racingKeep : Part of the genomes that always goes to the next round of racing (float, default 0.5)
+        racingConfidence : Width of the confidence intervals used by racing (float, default 2.0)
+        environment : If given, the fitness is the reward of an episode of this vectorized environment
+                      (see rollout, default None)
+        rolloutSteps : Max nb of steps of an episode of the environment (int, default 1000)
+        memoryReport : If given, the memory is measured every 'memoryReport' gen, see memory.records
+                       (int, default None : no measure)
+        metricsFile : If given, the metrics are written in this file after each gen, in the Prometheus text format
+                      (str, default None)
+        metricsPort : If given, the metrics are served on this port of localhost, by a background thread
+                      (int, default None)
+        checkpointDirectory : If given, a snapshot of the population is written in this directory every few gen,
+                              by a background thread, see restore (str, default None)
+        checkpointEvery : Nb of gen between 2 checkpoints (int, default 10)
+        checkpointKeep : Nb of checkpoints kept on disk (int, default 3, None : all of them)
         """
         # Default params
         params = {'demography' : 150,
@@ -28,8 +114,58 @@ class Population:
                   'bias' : True,
                   'initState' : 'one link',
                   'fitness' : lambda x:1,
+                  'dataset' : None,
+                  'loss' : 'mse',
+                  'phenotypeFitness' : None,
+                  'chunkRows' : 4096,
+                  'minibatch' : None,
                   'sensorName' : None, # TODO : Handle names with spaces (or prevent those with spaces)
-                  'outputName' : None} # TODO : Handle names with spaces (or prevent those with spaces)
+                  'outputName' : None, # TODO : Handle names with spaces (or prevent those with spaces)
+                  'c1' : 1.0,
+                  'c2' : 1.0,
+                  'c3' : 0.4,
+                  'threshold' : 3,
+                  'targetSpecies' : None,
+                  'thresholdStep' : 0.3,
+                  'thresholdMin' : 0.3,
+                  'sensorActivation' : 'sigmoid',
+                  'hiddenActivation' : 'sigmoid',
+                  'outputActivation' : 'sigmoid',
+                  'precision' : 'float64',
+                  'maxHidden' : None,
+                  'maxConnections' : None,
+                  'deleteConnectionRate' : 0,
+                  'deleteNodeRate' : 0,
+                  'memoSize' : None,
+                  'complexityPenalty' : None,
+                  'historySize' : None,
+                  'historyFile' : None,
+                  'hallOfFame' : 10,
+                  'hallOfFameFile' : None,
+                  'renderDirectory' : None,
+                  'seed' : None,
+                  'workers' : None,
+                  'chunkSize' : 25,
+                  'pipeline' : False,
+                  'behaviour' : None,
+                  'noveltyK' : 15,
+                  'archiveSize' : 500,
+                  'archivePolicy' : 'threshold',
+                  'noveltyThreshold' : 1.0,
+                  'archiveProbability' : 0.05,
+                  'episodeFitness' : None,
+                  'episodes' : 20,
+                  'firstEpisodes' : 2,
+                  'racingKeep' : 0.5,
+                  'racingConfidence' : 2.0,
+                  'environment' : None,
+                  'rolloutSteps' : 1000,
+                  'memoryReport' : None,
+                  'metricsFile' : None,
+                  'metricsPort' : None,
+                  'checkpointDirectory' : None,
+                  'checkpointEvery' : 10,
+                  'checkpointKeep' : 3}
         # Update params
         for key in kwargs:
             try:
@@ -37,26 +173,124 @@ class Population:
             except KeyError as e:
                 print('')
 
+        # Random generators
+        if params['seed'] is None:
+            params['seed'] = int(np.random.randint(2**31))
+        # Kept for the checkpoints
+        self.params = params
+        self.seed = params['seed']
+        self.workers = params['workers']
+        self.chunkSize = params['chunkSize']
+        self.pool = None  # Made when it's needed
+        self.pipeline = params['pipeline']
+        self.scheduler = None  # Made when it's needed
+        rng = np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key = (0,)))
+
         self.demography = params['demography']
-        self.genomeList = []
-        for i in range(self.demography):
-            self.genomeList.append(Genome(params['sensor'],
-                                       params['output'],
-                                       bias = params['bias'],
-                                       initState = params['initState'],
-                                       sensorName = params['sensorName'],
-                                       outputName = params['outputName']))
+        self.dtype = np.dtype(params['precision'])
+        # All the genomes are made at once (same topology, the weights are drawn together)
+        self.genomeList = Genome.initPopulation(self.demography,
+                                                params['sensor'],
+                                                params['output'],
+                                                rng,
+                                                bias = params['bias'],
+                                                initState = params['initState'],
+                                                sensorName = params['sensorName'],
+                                                outputName = params['outputName'],
+                                                sensorActivation = params['sensorActivation'],
+                                                hiddenActivation = params['hiddenActivation'],
+                                                outputActivation = params['outputActivation'],
+                                                precision = params['precision'],
+                                                maxHidden = params['maxHidden'],
+                                                maxConnections = params['maxConnections'],
+                                                deleteConnectionRate = params['deleteConnectionRate'],
+                                                deleteNodeRate = params['deleteNodeRate'],
+                                                memoSize = params['memoSize'])
         self.speciesList = []
         self.fitness = params['fitness']
+        if params['dataset'] is None:
+            self.dataset = None
+        else:
+            # Files are memory-mapped : they are read chunk by chunk
+            self.dataset = (openArray(params['dataset'][0]), openArray(params['dataset'][1]))
+        self.loss = params['loss']
+        self.phenotypeFitness = params['phenotypeFitness']
+        self.chunkRows = params['chunkRows']
+        self.minibatch = params['minibatch']
+        # Memorized outputs (see Genome.memoStats)
+        self.memoSize = params['memoSize']
+        self.memoHits = 0
+        self.memoMisses = 0
         # Generation stuff
         self.gen = 1
-        self.bestList = []
         self.best = self.genomeList[0]
         self.staleness = 0
         self.averageList = []
+        self.bestSpecies = None  # Id of the species the best genome comes from
         # Be able to graph species
         self.speciesHistory = []
         self.speciesTable = np.array([]).reshape((1,0))
+        self.speciesCount = 0  # Nb of species ever made (used to give them an id)
+        # Speciation
+        self.c1 = params['c1']
+        self.c2 = params['c2']
+        self.c3 = params['c3']
+        self.threshold = params['threshold']
+        self.targetSpecies = params['targetSpecies']
+        self.thresholdStep = params['thresholdStep']
+        self.thresholdMin = params['thresholdMin']
+        self.comparisons = 0  # Nb of genome / species comparisons made by the last speciation
+        # Fitness of the gen as arrays (one value per genome of genomeList, made by updateGenStats)
+        self.rawFitness = np.zeros(0)
+        self.sharedFitness = np.zeros(0)
+        self.speciesIndex = np.zeros(0, dtype=int)  # Index of the species of each genome in speciesList
+        self.members = []  # Species of each genome, while they are being speciated
+        # Complexity penalty (a number is a cost per gene)
+        if params['complexityPenalty'] is None or callable(params['complexityPenalty']):
+            self.complexityPenalty = params['complexityPenalty']
+        else:
+            cost = params['complexityPenalty']
+            self.complexityPenalty = lambda genome: cost * genome.complexity()
+        # Bounded history
+        self.historySize = params['historySize']
+        self.log = GenerationLog(self.historySize, params['historyFile'])
+        # The best genomes of all time (the best of each gen isn't kept anymore, only the best ones are)
+        self.hallOfFame = HallOfFame(params['hallOfFame'], params['hallOfFameFile'])
+        # Drawing
+        if params['renderDirectory'] is None:
+            self.renderer = None
+        else:
+            self.renderer = Renderer(params['renderDirectory'])
+        # Novelty search
+        self.behaviour = params['behaviour']
+        self.archive = BehaviourArchive(params['archiveSize'], params['noveltyK'], params['archivePolicy'],
+                                        params['noveltyThreshold'], params['archiveProbability'],
+                                        np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key = (0, 1))))
+        # Fitness made of episodes
+        self.episodeFitness = params['episodeFitness']
+        self.racing = Racing(params['episodes'], params['firstEpisodes'], params['racingKeep'],
+                             params['racingConfidence'])
+        # Vectorized environment
+        self.environment = params['environment']
+        self.rolloutSteps = params['rolloutSteps']
+        # Memory accounting
+        if params['memoryReport'] is None:
+            self.memory = None
+        else:
+            self.memory = MemoryReport(params['memoryReport'])
+        # Metrics
+        self.timings = {}  # phase -> duration of the phase during the last gen (s)
+        self.evaluations = 0  # Nb of fitness evaluations made
+        if params['metricsFile'] is None and params['metricsPort'] is None:
+            self.metrics = None
+        else:
+            self.metrics = Metrics(params['metricsFile'], params['metricsPort'])
+        # Checkpoints
+        if params['checkpointDirectory'] is None:
+            self.checkpointer = None
+        else:
+            self.checkpointer = Checkpointer(params['checkpointDirectory'], params['checkpointEvery'],
+                                             params['checkpointKeep'])
 
 
     ## Generation stuff
@@ -71,54 +305,111 @@ class Population:
         ----------
         species : the new species (Species)
         """
+        species.id = self.speciesCount
+        self.speciesCount += 1
         self.speciesList.append(species)
         # Used to graph the species
         self.speciesHistory.append(species)
-        newColumn = np.zeros((self.gen,1))
-        self.speciesTable = np.append(self.speciesTable, newColumn, axis = 1)
+        if self.historySize is None:
+            newColumn = np.zeros((self.gen,1))
+            self.speciesTable = np.append(self.speciesTable, newColumn, axis = 1)
 
     def sortInSpecies(self):
         """
         Sort the population in species
         """
+        self.startSpeciation()
+        # Go through all the genomes
+        for genome in self.genomeList:
+            self.speciate(genome)
+        self.finishSpeciation()
+
+    def startSpeciation(self):
+        """
+        Get ready to sort genomes in species (they have to be given in order to speciate, see sortInSpecies)
+        """
         # Be sure the species are empty
         for species in self.speciesList:
             species.clear()
-        # Go through all the genomes
-        for genome in self.genomeList:
-            foundSpecies = False
-            # Go through all the species
-            for species in self.speciesList:
-                if species.matches(genome):
-                    # If it has found one it become part of it
-                    species.addGenome(genome)
-                    foundSpecies = True
-                    break
-            if not foundSpecies:
-                # Otherwise we make a new species
-                newSpecies = Species(genome)
-                self.addSpecies(newSpecies)
-        # Once we have gone through all the genomes, if a species is empty, it disappear
+        self.comparisons = 0
+        self.members = []  # Species of each genome
+
+    def speciate(self, genome):
+        """
+        Put a genome (that has a fitness) in its species
+
+        Params
+        ----------
+        genome : (Genome)
+        """
+        # Go through all the species
+        for species in self.speciesList:
+            self.comparisons += 1
+            if species.matches(genome, self.c1, self.c2, self.c3, self.threshold):
+                # If it has found one it become part of it
+                species.addGenome(genome)
+                self.members.append(species)
+                return
+        # Otherwise we make a new species
+        newSpecies = Species(genome)
+        self.addSpecies(newSpecies)
+        self.members.append(newSpecies)
+
+    def finishSpeciation(self):
+        """
+        Once we have gone through all the genomes
+        """
+        # If a species is empty, it disappear
         for i in range(len(self.speciesList))[::-1]:
             if self.speciesList[i].isEmpty():
                 self.speciesList.pop(i)
+        position = {id(species) : i for i, species in enumerate(self.speciesList)}
+        self.speciesIndex = np.array([position[id(species)] for species in self.members], dtype=int)
+        self.members = []
+        self.adaptThreshold()
+
+    def adaptThreshold(self):
+        """
+        Move the threshold toward the target nb of species (a low threshold makes more species)
+        Fewer species also means fewer comparisons for the next speciation
+        """
+        if self.targetSpecies is None:
+            return
+        if len(self.speciesList) > self.targetSpecies:
+            self.threshold += self.thresholdStep
+        elif len(self.speciesList) < self.targetSpecies:
+            self.threshold = max(self.threshold - self.thresholdStep, self.thresholdMin)
 
     def shareFitness(self):
         """
-        Share the fitness of the genomes with the species it belongs to
+        'Share' the fitness of the genomes inside the species they belong to
+        (the complexity penalty is taken from the raw fitness before it's shared, the shared fitness is never < 0)
         """
-        for species in self.speciesList:
-            species.shareFitness()
+        fitness = self.rawFitness
+        if self.complexityPenalty is not None:
+            penalty = np.array([self.complexityPenalty(genome) for genome in self.genomeList], dtype=float)
+            fitness = np.maximum(fitness - penalty, 0)
+        sizes = np.bincount(self.speciesIndex, minlength = len(self.speciesList))
+        self.sharedFitness = fitness / sizes[self.speciesIndex]
+        for genome, shared in zip(self.genomeList, self.sharedFitness.tolist()):
+            genome.sharedFitness = shared
 
     def purge(self):
         """
         Kill the bottom half of each species + kill stale species
+        The genomes of the species are sorted by updateChamp
         """
-        for i, species in list(enumerate(self.speciesList))[::-1]:
+        for species in self.speciesList:
             if species.staleness > 15:
                 species.clear()
-                self.speciesList.pop(i)
-            species.purge()
+        self.speciesList = [species for species in self.speciesList if species.staleness <= 15]
+        if len(self.speciesList) == 0:
+            return
+        sizes = np.array([len(species.genomeList) for species in self.speciesList])
+        # Species with only 1 genome have their genome saved
+        halves = (sizes + 1) // 2
+        for species, half in zip(self.speciesList, halves.tolist()):
+            species.genomeList = species.genomeList[:half]
 
     def speciesAnalysis(self):
         """
@@ -131,40 +422,67 @@ class Population:
                 species.champGoThrough = True
             average += species.averageFitness * len(species.genomeList)
         self.averageList.append(average / len(self.genomeList))
+        if self.historySize is not None:
+            del self.averageList[:-self.historySize]
 
     def updateSpeciesAverageFitness(self):
         """
-        Update the average fitness of the species (also update the average of the
+        Update the average fitness of the species
+        Shared fitness are fitnesses divided by the number of genomes in the species, so we only need to add those up
         """
-        for species in self.speciesList:
-            species.updateAverageFitness()
+        averages = np.bincount(self.speciesIndex, weights = self.sharedFitness, minlength = len(self.speciesList))
+        for species, average in zip(self.speciesList, averages.tolist()):
+            species.averageFitness = average
 
-    def updateMascots(self):
+    def updateMascots(self, rng = None):
         """
         Update the mascots of the species (a random genome amongst the species
+
+        Params
+        ----------
+        rng: Random generator (np.random.Generator, default np.random)
         """
         for species in self.speciesList:
-            species.updateMascot()
+            species.updateMascot(rng)
 
 
-    def selectSpecies(self):
+    def selectSpecies(self, rng = None):
         """
         Select a species based on it's fitness average
+
+        Params
+        ----------
+        rng: Random generator (np.random.Generator, default np.random)
         """
+        if rng is None:
+            rng = np.random
         totalSum = 0
         averageList = []
         for species in self.speciesList:
             totalSum += species.averageFitness
             averageList.append(species.averageFitness)
-        probability = np.array(averageList) / totalSum
-        return np.random.choice(self.speciesList, p = probability)
+        # Every fitness is 0 (a complexity penalty can do that) : all the species have the same chance
+        probability = np.array(averageList) / totalSum if totalSum > 0 else None
+        return self.speciesList[rng.choice(len(self.speciesList), p = probability)]
 
     def updateChamp(self):
         """
-        Update the champ of the species
+        Update the champ of the species (their genomes get sorted by raw fitness, fittest first)
         """
-        for s in self.speciesList:
-            s.updateChamp()
+        # Sorted by species, then by raw fitness (stable : genomes with the same fitness keep their order)
+        order = np.lexsort((-self.rawFitness, self.speciesIndex))
+        bounds = np.cumsum(np.bincount(self.speciesIndex, minlength = len(self.speciesList))).tolist()
+        order = order.tolist()
+        start = 0
+        for species, stop in zip(self.speciesList, bounds):
+            species.genomeList = [self.genomeList[i] for i in order[start:stop]]
+            start = stop
+            species.champ = species.genomeList[0]
+            if species.champ.rawFitness > species.best.rawFitness:
+                species.best = species.champ
+                species.staleness = 0
+            else:
+                species.staleness += 1
 
 
     # ------------------------------------------------------------------------------------------------------------------
@@ -173,8 +491,52 @@ class Population:
         """
         Updates the fitness of all the genomes
         """
+        if self.environment is not None:
+            # Every genome plays in its own copy of the environment, all at once
+            self.rollout(self.environment, self.rolloutSteps)
+            self.evaluations += len(self.genomeList)
+            return
+        if self.episodeFitness is not None:
+            # Episodes are given to the genomes that still have a chance (see Racing.py)
+            rng = np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key = (self.gen, 0, 1)))
+            self.racing.evaluate(self.genomeList, self.episodeFitness, rng)
+            self.evaluations += self.racing.used
+            return
+        if self.dataset is not None:
+            # The whole population is scored at once
+            rows = None
+            if self.minibatch is not None and self.minibatch < len(self.dataset[0]):
+                # Same samples for every genome of the gen (sorted so that files are read forward)
+                rng = np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key = (self.gen, 0, 2)))
+                rows = np.sort(rng.choice(len(self.dataset[0]), self.minibatch, replace = False))
+            fitness = self.scoreDataset(self.dataset[0], self.dataset[1], self.loss, self.chunkRows, rows)
+            for genome, value in zip(self.genomeList, fitness):
+                genome.rawFitness = float(value)
+            self.evaluations += len(self.genomeList)
+            return
+        if self.phenotypeFitness is not None:
+            # Genes go to the workers through shared memory
+            self.evaluateShared(self.phenotypeFitness)
+            self.evaluations += len(self.genomeList)
+            return
         for genome in self.genomeList:
             genome.rawFitness = self.fitness(genome)
+        self.evaluations += len(self.genomeList)
+
+    def updateNovelty(self):
+        """
+        Novelty search : the raw fitness of the genomes is the novelty of their behaviour
+        (used instead of updateFitness)
+        """
+        behaviours = []
+        for genome in self.genomeList:
+            behaviours.append(np.ravel(self.behaviour(genome)))
+        behaviours = np.array(behaviours, dtype=float)
+        sparseness = self.archive.sparseness(behaviours)
+        for genome, novelty in zip(self.genomeList, sparseness):
+            genome.rawFitness = novelty
+        self.archive.insert(behaviours, sparseness)
+        self.evaluations += len(self.genomeList)
 
     def updateBest(self):
         """
@@ -183,36 +545,34 @@ class Population:
         for species in self.speciesList:
             if species.best.rawFitness > self.best.rawFitness:
                 self.best = species.best
+                self.bestSpecies = species.id
                 self.staleness = 0
+            self.hallOfFame.add(species.champ)
         self.staleness += 1
 
     def sortSpeciesList(self):
         """
-        Sort the list of species
+        Sort the list of species (best average fitness first, stable)
         """
-        L = self.speciesList
+        averages = np.array([species.averageFitness for species in self.speciesList], dtype=float)
+        order = np.argsort(-averages, kind = 'stable')
+        self.speciesList = [self.speciesList[i] for i in order.tolist()]
 
-        n = len(L)
-        for i in range(1, n):
-            j = i
-            species = L[i]
-            while 0 < j and species.averageFitness > L[j - 1].averageFitness:
-                L[j] = L[j - 1]
-                j = j - 1
-            L[j] = species
 
-
-    def selectGenome(self):
+    def selectGenome(self, rng = None):
         """
         Select a genome based on sharedFitness
+
+        Params
+        ----------
+        rng: Random generator (np.random.Generator, default np.random)
         """
-        totalSum = 0
-        fitnessList = []
-        for genome in self.genomeList:
-            totalSum += genome.sharedFitness
-            fitnessList.append(genome.sharedFitness)
-        probability = np.array(fitnessList) / totalSum
-        return np.random.choice(self.genomeList, p=probability)
+        if rng is None:
+            rng = np.random
+        totalSum = self.sharedFitness.sum()
+        # Every fitness is 0 (a complexity penalty can do that) : all the genomes have the same chance
+        probability = self.sharedFitness / totalSum if totalSum > 0 else None
+        return self.genomeList[rng.choice(len(self.genomeList), p=probability)]
 
     # ------------------------------------------------------------------------------------------------------------------
     # Generation management
@@ -221,25 +581,58 @@ class Population:
         """
         Update the gen stats
         """
-        self.updateFitness()
-        self.sortInSpecies()
+        start = time.perf_counter()
+        pipelined = self.pipelined()
+        if pipelined:
+            # Evaluation and speciation overlap : both are in the evaluation phase
+            self.evaluateAndSpeciate()
+        elif self.behaviour is None:
+            self.updateFitness()
+        else:
+            self.updateNovelty()
+        self.timings['evaluation'] = time.perf_counter() - start
+        self.rawFitness = np.array([genome.rawFitness for genome in self.genomeList], dtype=float)
+        if self.memoSize is not None:
+            # Every genome of the gen is new (its counters start at 0)
+            for genome in self.genomeList:
+                self.memoHits += genome.memoHits
+                self.memoMisses += genome.memoMisses
+        start = time.perf_counter()
+        if not pipelined:
+            self.sortInSpecies()
         self.shareFitness()
         self.updateChamp()
         self.updateSpeciesAverageFitness()
         self.updateBest()
+        self.timings['speciation'] = time.perf_counter() - start
 
 
     def nextGen(self):
         """
         Make the next gen
         """
+        genStart = time.perf_counter()
+        evaluations = self.evaluations
         self.updateGenStats()
+        start = time.perf_counter()
         self.speciesAnalysis()
+        self.log.add(self.summary())
+        if self.renderer is not None:
+            # Render the champion of this gen (in the background)
+            champ = self.speciesList[0].champ
+            for species in self.speciesList[1:]:
+                if species.champ.rawFitness > champ.rawFitness:
+                    champ = species.champ
+            self.renderer.submit(champ, 'gen{}'.format(self.gen))
         # Be able to graph species
-        newLine = np.zeros((1, len(self.speciesHistory)))
-        self.speciesTable = np.append(self.speciesTable, newLine, axis=0)
-        for i,s in enumerate(self.speciesHistory):
-            self.speciesTable[self.gen-1, i] = len(s.genomeList)
+        if self.historySize is None:
+            newLine = np.zeros((1, len(self.speciesHistory)))
+            self.speciesTable = np.append(self.speciesTable, newLine, axis=0)
+            for i,s in enumerate(self.speciesHistory):
+                self.speciesTable[self.gen-1, i] = len(s.genomeList)
+        else:
+            # Only the living species are kept, the past is in the log
+            self.speciesHistory = list(self.speciesList)
         # Purge
         self.purge()
         # If the population hasn't evolved in 20 gen : only keep the top 2 species
@@ -251,14 +644,106 @@ class Population:
             print('Stale')
             # Reset the staleness counter
             self.staleness = 0
-        self.updateMascots()
-        self.newPop()
+        rng = self.generationRng()
+        self.updateMascots(rng)
+        self.timings['analysis'] = time.perf_counter() - start
+        measure = self.memory is not None and self.memory.sampled(self.gen)
+        if measure:
+            self.memory.start()
+        start = time.perf_counter()
+        self.newPop(rng)
+        self.timings['reproduction'] = time.perf_counter() - start
+        if measure:
+            self.memory.stop(self)
+        if self.checkpointer is not None and self.checkpointer.due(self.gen - 1):
+            # Only the snapshot is made here, it's written in the background
+            start = time.perf_counter()
+            self.checkpointer.submit(self.snapshot(), self.gen - 1)
+            self.timings['checkpoint'] = time.perf_counter() - start
+        else:
+            self.timings.pop('checkpoint', None)
+        if self.metrics is not None:
+            self.metrics.update(self.metricValues(time.perf_counter() - genStart, self.evaluations - evaluations))
+
+
+    def generationRng(self):
+        """
+        Random generator of the current gen (always the same for a given seed and gen)
+        """
+        return np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key = (self.gen, 0)))
 
+    def getPool(self):
+        """
+        Get the pool of processes used to make the children
+        """
+        if self.pool is None:
+            # Only imported when workers are used
+            from concurrent.futures import ProcessPoolExecutor
+            self.pool = ProcessPoolExecutor(self.workers)
+        return self.pool
 
-    def newPop(self):
+    def pipelined(self):
+        """
+        Tell if the gens are pipelined (see the pipeline param, the other fitness can't be evaluated batch by batch)
+        """
+        return self.pipeline and self.behaviour is None and self.environment is None and \
+            self.episodeFitness is None and self.dataset is None
+
+    def getScheduler(self):
+        """
+        Get the scheduler of the evaluations of the pipeline
+        """
+        if self.scheduler is None:
+            pool = None if self.workers is None else self.getPool()
+            self.scheduler = Scheduler(self.fitness, self.phenotypeFitness, pool, self.dtype)
+        return self.scheduler
+
+    def close(self):
+        """
+        Free what the population holds outside of this process : the evaluations of the pipeline that were never
+        given back (their shared memory) and the pool of workers, and stop the background work
+        (metrics endpoint and writer, checkpoints and renders : the ones already submitted are written first)
+        """
+        if self.metrics is not None:
+            self.metrics.close()
+        if self.checkpointer is not None:
+            self.checkpointer.close()
+        if self.renderer is not None:
+            self.renderer.close()
+        if self.scheduler is not None:
+            self.scheduler.clear()
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+            self.scheduler = None
+
+    def evaluateAndSpeciate(self):
+        """
+        Speciate the genomes batch after batch, as soon as they have their fitness (see the pipeline param)
+        The genomes go through the speciation in the same order as with sortInSpecies
+        """
+        scheduler = self.getScheduler()
+        if not scheduler.pending:
+            # Nobody has sent them yet (first gen, or restored population)
+            for start in range(0, len(self.genomeList), self.chunkSize):
+                scheduler.submit(self.genomeList[start:start + self.chunkSize])
+        self.startSpeciation()
+        for genomes in scheduler.results():
+            self.evaluations += len(genomes)
+            for genome in genomes:
+                self.speciate(genome)
+        self.finishSpeciation()
+
+    def newPop(self, rng = None):
         """
         Make a new population
+
+        Params
+        ----------
+        rng: Random generator used to pick the parents (np.random.Generator, default : the one of the gen)
         """
+        if rng is None:
+            rng = self.generationRng()
         # Make the new gen
         newPop = []
 
@@ -266,36 +751,244 @@ class Population:
         for species in self.speciesList:
             if species.champGoThrough:
                 newPop.append(copy(species.champ))
+        pipelined = self.pipelined()
+        if pipelined:
+            self.getScheduler().submit(list(newPop))
 
-        # Fill the other part of the population with people
-        while len(newPop) < self.demography:
+        # Pick the parents of the other part of the population
+        recipes = []
+        while len(newPop) + len(recipes) < self.demography:
             # 25% of the new pop are genomes from the previous gen that received a mutation
-            if np.random.rand() < 0.25:
-                child = copy(self.selectGenome())
-                child.mutate()
+            if rng.random() < 0.25:
+                recipes.append((self.selectGenome(rng),))
             # 75% of the new pop come from crossover
             else:
                     # 0.1% chance crossover happens with parents from a different species
-                    if np.random.rand() < 0.001:
-                        parent1 = self.selectGenome()
-                        parent2 = self.selectGenome()
+                    if rng.random() < 0.001:
+                        parent1 = self.selectGenome(rng)
+                        parent2 = self.selectGenome(rng)
                     # 99.9 % chance it happens within a species
                     else:
                         if len(self.speciesList) != 0:  # Note : To be able to pick species, we need them to exist
-                            species = self.selectSpecies()
-                            parent1 = species.selectGenome()
-                            parent2 = species.selectGenome()
+                            species = self.selectSpecies(rng)
+                            parent1 = species.selectGenome(rng)
+                            parent2 = species.selectGenome(rng)
                         else:  # If there is no species left
-                            parent1 = self.selectGenome()
-                            parent2 = self.selectGenome()
-                    child = Genome.crossover(parent1, parent2)
-                    child.mutate()
-            newPop.append(child)
+                            parent1 = self.selectGenome(rng)
+                            parent2 = self.selectGenome(rng)
+                    recipes.append((parent1, parent2))
+
+        # The children are made by jobs (see Reproduction.py), each one with its own random generator
+        innovationNumber = History.innovationNumber
+        # The history grows while the results are merged, and a job can be sent to a worker after that
+        innovationHistory = list(Genome.innovationHistory)
+        jobs = []
+        for i, start in enumerate(range(0, len(recipes), self.chunkSize)):
+            parents = []
+            indexes = {}
+            chunk = []
+            for recipe in recipes[start:start + self.chunkSize]:
+                for parent in recipe:
+                    if id(parent) not in indexes:
+                        indexes[id(parent)] = len(parents)
+                        parents.append(parent)
+                chunk.append(tuple(indexes[id(parent)] for parent in recipe))
+            seed = np.random.SeedSequence(self.seed, spawn_key = (self.gen, i + 1))
+            jobs.append((seed, parents, chunk, innovationHistory, innovationNumber))
+        # The results come back in order, as soon as they are ready
+        if self.workers is None:
+            results = map(reproduce, jobs)
+        else:
+            results = self.getPool().map(reproduce, jobs)
+        # Give their real numbers to the new innovations, job after job (always in the same order)
+        for children, newInnovations in results:
+            mergeInnovations(children, newInnovations, innovationNumber)
+            newPop += children
+            if pipelined:
+                # They are evaluated while the next ones are made
+                self.scheduler.submit(children)
 
         self.genomeList = newPop
         # Once we are done, increase the gen counter
         self.gen += 1
-        self.bestList.append(self.best)
+
+    def summary(self):
+        """
+        Compact summary of the current generation (kept in the log)
+        """
+        return {'gen' : self.gen,
+                'bestFitness' : float(self.best.rawFitness),
+                'bestSize' : [len(self.best.nodeList), len(self.best.connectionList)],
+                'bestSpecies' : self.bestSpecies,
+                'averageFitness' : float(self.averageList[-1]),
+                'threshold' : float(self.threshold),
+                'comparisons' : self.comparisons,
+                'species' : [[s.id, len(s.genomeList)] for s in self.speciesList]}
+
+    def metricValues(self, duration, evaluations):
+        """
+        Values exported by the metrics (see Metrics.py)
+
+        Params
+        ----------
+        duration : duration of the last gen (float, s)
+        evaluations : nb of fitness evaluations made during the last gen (int)
+        """
+        nodes = 0
+        connections = 0
+        for genome in self.genomeList:
+            nodes += len(genome.nodeList)
+            connections += len(genome.connectionList)
+        return {'neat_generation' : self.gen,
+                'neat_generations_total' : self.gen - 1,
+                'neat_generation_seconds' : duration,
+                'neat_generation_rate' : 1 / duration if duration > 0 else 0,
+                'neat_evaluations_total' : self.evaluations,
+                'neat_evaluations_per_second' : evaluations / duration if duration > 0 else 0,
+                'neat_phase_seconds' : dict(self.timings),
+                'neat_species' : len(self.speciesList),
+                'neat_species_comparisons' : self.comparisons,
+                'neat_compatibility_threshold' : self.threshold,
+                'neat_best_fitness' : self.best.rawFitness,
+                'neat_average_fitness' : self.averageList[-1],
+                'neat_mean_genome_nodes' : nodes / len(self.genomeList),
+                'neat_mean_genome_connections' : connections / len(self.genomeList),
+                'neat_innovations' : len(Genome.innovationHistory),
+                'neat_memo_hit_rate' : self.memoStats()['hitRate']}
+
+    ## Checkpoints
+    # ------------------------------------------------------------------------------------------------------------------
+    def snapshot(self):
+        """
+        Compact copy of the state of the population (genomes, species, innovations, random generators, stats)
+        Nothing in it is shared with the population, so it can be written while the population goes on
+        """
+        # Every genome is packed once, the rest refers to them by index
+        genomes = []
+        index = {}
+
+        def ref(genome):
+            if id(genome) not in index:
+                index[id(genome)] = len(genomes)
+                genomes.append(genome)
+            return index[id(genome)]
+
+        population = [ref(genome) for genome in self.genomeList]
+        species = {}
+        for s in self.speciesHistory + self.speciesList:
+            species[s.id] = {'id' : s.id,
+                             'mascot' : ref(s.mascot),
+                             'genomeList' : [ref(genome) for genome in s.genomeList],
+                             'best' : ref(s.best),
+                             'champ' : ref(s.champ),
+                             'champGoThrough' : s.champGoThrough,
+                             'staleness' : s.staleness,
+                             'averageFitness' : s.averageFitness,
+                             'populationHistory' : list(s.populationHistory)}
+        innovations = [(h.nodeIn.identifier, h.nodeIn.kind, h.nodeOut.identifier, h.nodeOut.kind, h.number)
+                       for h in Genome.innovationHistory]
+        # The params that can't be saved (functions, datasets, environments) have to be given again to restore
+        params = {}
+        for key, value in self.params.items():
+            if key != 'dataset' and isinstance(value, (int, float, str, bool, tuple, list, type(None))):
+                params[key] = value
+        state = {'gen' : self.gen,
+                 'best' : ref(self.best),
+                 'bestSpecies' : self.bestSpecies,
+                 'staleness' : self.staleness,
+                 'averageList' : list(self.averageList),
+                 'speciesList' : [s.id for s in self.speciesList],
+                 'speciesHistory' : [s.id for s in self.speciesHistory],
+                 'speciesTable' : self.speciesTable.copy(),
+                 'speciesCount' : self.speciesCount,
+                 'evaluations' : self.evaluations,
+                 'threshold' : self.threshold,
+                 'memo' : (self.memoHits, self.memoMisses),
+                 'log' : (list(self.log.summaries), self.log.spilled),
+                 'hallOfFame' : ([ref(genome) for genome in self.hallOfFame], list(self.hallOfFame.spilled)),
+                 'archive' : {'behaviours' : None if self.archive.behaviours is None else self.archive.behaviours.copy(),
+                              'count' : self.archive.count,
+                              'next' : self.archive.next,
+                              'stale' : self.archive.stale,
+                              'threshold' : self.archive.threshold,
+                              'rng' : self.archive.rng.bit_generator.state},
+                 'globalRng' : np.random.get_state()}
+        return {'params' : params,
+                'genomes' : packGenomes(genomes),
+                'population' : population,
+                'species' : list(species.values()),
+                'innovations' : innovations,
+                'innovationNumber' : History.innovationNumber,
+                'state' : state}
+
+    @staticmethod
+    def restore(checkpoint, **kwargs):
+        """
+        Make a population from a checkpoint (it goes on as if it had never stopped)
+        Note : the innovation history of the genomes is replaced by the one of the checkpoint
+
+        Params
+        ----------
+        checkpoint : path of a checkpoint, or a snapshot (str or dict)
+        kwargs : params that couldn't be saved (fitness, dataset, ...) or that are changed
+        """
+        snapshot = load(checkpoint) if isinstance(checkpoint, str) else checkpoint
+        state = snapshot['state']
+        population = Population(**dict(snapshot['params'], **kwargs))
+        # Innovations
+        Genome.innovationHistory = []
+        for nodeIn, kindIn, nodeOut, kindOut, number in snapshot['innovations']:
+            innovation = History.__new__(History)
+            innovation.nodeIn = Node(nodeIn, kindIn)
+            innovation.nodeOut = Node(nodeOut, kindOut)
+            innovation.number = number
+            Genome.innovationHistory.append(innovation)
+        History.innovationNumber = snapshot['innovationNumber']
+        # Genomes
+        genomes = unpackGenomes(snapshot['genomes'])
+        population.genomeList = [genomes[i] for i in snapshot['population']]
+        # Species
+        species = {}
+        for saved in snapshot['species']:
+            s = Species(genomes[saved['mascot']])
+            s.id = saved['id']
+            s.genomeList = [genomes[i] for i in saved['genomeList']]
+            s.best = genomes[saved['best']]
+            s.champ = genomes[saved['champ']]
+            s.champGoThrough = saved['champGoThrough']
+            s.staleness = saved['staleness']
+            s.averageFitness = saved['averageFitness']
+            s.populationHistory = saved['populationHistory']
+            species[s.id] = s
+        population.speciesList = [species[i] for i in state['speciesList']]
+        population.speciesHistory = [species[i] for i in state['speciesHistory']]
+        # Stats
+        population.gen = state['gen']
+        population.best = genomes[state['best']]
+        population.bestSpecies = state['bestSpecies']
+        population.staleness = state['staleness']
+        population.averageList = state['averageList']
+        population.speciesTable = state['speciesTable']
+        population.speciesCount = state['speciesCount']
+        population.evaluations = state['evaluations']
+        population.threshold = state['threshold']
+        population.memoHits, population.memoMisses = state['memo']
+        population.log.summaries.extend(state['log'][0])
+        population.log.spilled = state['log'][1]
+        for i in state['hallOfFame'][0]:
+            population.hallOfFame.add(genomes[i])
+        # The genomes already in the file (it's written after them)
+        population.hallOfFame.spilled = state['hallOfFame'][1]
+        population.hallOfFame.hashes.update(entry[3] for entry in state['hallOfFame'][1])
+        archive = state['archive']
+        population.archive.behaviours = archive['behaviours']
+        population.archive.count = archive['count']
+        population.archive.next = archive['next']
+        population.archive.stale = archive['stale']
+        population.archive.threshold = archive['threshold']
+        population.archive.rng.bit_generator.state = archive['rng']
+        np.random.set_state(state['globalRng'])
+        return population
 
     ## Net stuff
     # ------------------------------------------------------------------------------------------------------------------
@@ -311,6 +1004,144 @@ class Population:
         for genome in self.genomeList:
             genome.evaluate(inputs)
 
+    def evaluateBatch(self, inputs):
+        """
+        Evaluate every genome of the population on a batch of inputs
+        The genomes that share a topology are evaluated together (one stacked matmul per layer)
+
+        Params
+        ----------
+        inputs : the same inputs for every genome (2D array, or a single list of values)
+                 or one batch per genome, in the order of genomeList (3D array)
+
+        Returns
+        ----------
+        outputs : one batch of outputs per genome (3D array, 2D for a single list of values)
+        """
+        return self.evaluateGroups(self.topologyGroups(), inputs)
+
+    def scoreDataset(self, inputs, targets, loss = 'mse', chunkRows = None, rows = None):
+        """
+        Fitness of every genome on a dataset (the whole population is evaluated at once, chunk by chunk, see Loss.py)
+
+        Params
+        ----------
+        inputs : value of the sensors, one row per sample (2D array, can be a np.memmap)
+        targets : expected outputs, one row per sample (2D array, or 1D for a single output)
+        loss : name of the loss ('mse', 'crossEntropy', 'accuracy', 'distance', default 'mse')
+        chunkRows : nb of samples evaluated at once (int, default None : all of them)
+        rows : samples used, in increasing order (int np.array, default None : all of them)
+        """
+        # The topologies and weights are the same for every chunk
+        groups = self.topologyGroups()
+        return streamScore(lambda chunk: self.evaluateGroups(groups, chunk), inputs, targets, loss, chunkRows, rows)
+
+    def memoStats(self):
+        """
+        Hits, misses and hit rate of the memorized outputs, over all the evaluations made (see Genome.memoStats)
+        """
+        total = self.memoHits + self.memoMisses
+        return {'hits' : self.memoHits,
+                'misses' : self.memoMisses,
+                'hitRate' : self.memoHits / total if total else 0.0}
+
+    def evaluateShared(self, fitness):
+        """
+        Give a raw fitness to every genome, in the worker processes (or in this one if there are no workers)
+        The genes of the whole population are put in shared memory once : the workers read them from there
+        and write the fitness in a shared array, no genome is pickled
+
+        Params
+        ----------
+        fitness : (func : phenotype -> fitness, defined at the top of a module so that it can be sent to the workers)
+        """
+        with SharedPopulation(self.genomeList, self.dtype) as shared:
+            jobs = []
+            for start in range(0, len(self.genomeList), self.chunkSize):
+                jobs.append((shared.descriptor, start, min(start + self.chunkSize, len(self.genomeList)), fitness))
+            if self.workers is None:
+                list(map(evaluateSlice, jobs))
+            else:
+                list(self.getPool().map(evaluateSlice, jobs))
+            values = shared.fitness.copy()
+        for genome, value in zip(self.genomeList, values):
+            genome.rawFitness = float(value)
+        return values
+
+    def topologyGroups(self):
+        """
+        Group the genomes of the population by topology (see Genome.topology)
+        Returns a list of (phenotype, indexes of the genomes, weight matrices of the layers)
+        """
+        groups = {}
+        for i, genome in enumerate(self.genomeList):
+            groups.setdefault(genome.topology(), []).append(i)
+        topologyGroups = []
+        for phenotype, indexes in groups.items():
+            weights = np.array([self.genomeList[i].weightVector() for i in indexes], dtype=self.dtype)
+            weights = weights.reshape(len(indexes), -1)
+            topologyGroups.append((phenotype, np.array(indexes), phenotype.layerMatrices(weights)))
+        return topologyGroups
+
+    def evaluateGroups(self, groups, inputs, active = None):
+        """
+        Evaluate the genomes of the population, group after group (see topologyGroups)
+
+        Params
+        ----------
+        groups : (see topologyGroups)
+        inputs : same as evaluateBatch
+        active : which genomes are evaluated, the outputs of the others stay at 0 (bool np.array, default all)
+        """
+        inputs = np.asarray(inputs, dtype=self.dtype)
+        if inputs.ndim == 1:
+            shape = (len(self.genomeList), groups[0][0].output)
+        else:
+            shape = (len(self.genomeList), inputs.shape[-2], groups[0][0].output)
+        outputs = np.zeros(shape, dtype=self.dtype)
+        for phenotype, indexes, matrices in groups:
+            if active is not None:
+                keep = active[indexes]
+                if not keep.any():
+                    continue
+                indexes = indexes[keep]
+                matrices = [matrix[keep] for matrix in matrices]
+            if inputs.ndim == 3:
+                outputs[indexes] = phenotype.propagate(inputs[indexes], matrices, len(indexes), self.dtype)
+            else:
+                outputs[indexes] = phenotype.propagate(inputs, matrices, len(indexes), self.dtype)
+        return outputs
+
+    def rollout(self, environment, steps = 1000):
+        """
+        Play one episode with every genome at once, each one in its own copy of a vectorized environment
+        The raw fitness of a genome is the sum of the rewards it got before its episode ended
+
+        Params
+        ----------
+        environment : vectorized environment, with 2 methods :
+                      reset(n) -> first observations of n environments (2D array, one row per genome)
+                      step(actions) -> (observations, rewards, done), one row/value per genome
+                      (the actions of the genomes that are done are 0, their rewards are ignored)
+        steps : max nb of steps of an episode (int, default 1000)
+        """
+        # The topologies and weights don't change during the episode
+        groups = self.topologyGroups()
+        observations = np.asarray(environment.reset(len(self.genomeList)), dtype=float)
+        rewards = np.zeros(len(self.genomeList))
+        active = np.ones(len(self.genomeList), dtype=bool)
+        for step in range(steps):
+            if not active.any():
+                break
+            # One forward pass of the whole population (each genome gets its own observation)
+            actions = self.evaluateGroups(groups, observations[:, None, :], active)[:, 0]
+            observations, reward, done = environment.step(actions)
+            observations = np.asarray(observations, dtype=float)
+            rewards += np.where(active, reward, 0)
+            active &= ~np.asarray(done, dtype=bool)
+        for genome, reward in zip(self.genomeList, rewards):
+            genome.rawFitness = reward
+
     ## Final stuff
     # ------------------------------------------------------------------------------------------------------------------
     # Graphs
@@ -318,19 +1149,22 @@ class Population:
         """
         Graph the best fitness and the average fitness of the species
         """
+        # Graphing is optional : matplotlib is only needed here
+        import matplotlib.pyplot as plt
         # Prepare
         fig = plt.figure()
         ax = fig.add_subplot(111)
-        x = range(len(self.bestList))
+        summaries = self.log.load()
+        x = [summary['gen'] for summary in summaries]
         # Graph best fitness
         bestFitness = []
-        for b in self.bestList:
-            bestFitness.append(b.rawFitness)
+        for summary in summaries:
+            bestFitness.append(summary['bestFitness'])
         ax.plot(x, bestFitness, color='red', label='Max fitness')
         # Graph average
         average = []
-        for av in self.averageList:
-            average.append(av)
+        for summary in summaries:
+            average.append(summary['averageFitness'])
         ax.plot(x, average, color='green', label='average')
         # Graph
         ax.legend()
@@ -342,9 +1176,23 @@ class Population:
         """
         Draw a graph where we can see species evolution
         """
+        import matplotlib.pyplot as plt
         fig = plt.figure()
         ax = fig.add_subplot(111)
-        ax.stackplot(range(1,self.gen+1), self.speciesTable.transpose())
+        if self.historySize is None:
+            ax.stackplot(range(1,self.gen+1), self.speciesTable.transpose())
+        else:
+            # Rebuild the table from the summaries we still have
+            summaries = self.log.load()
+            columns = {}
+            for summary in summaries:
+                for identifier, size in summary['species']:
+                    columns.setdefault(identifier, len(columns))
+            table = np.zeros((len(summaries), len(columns)))
+            for i, summary in enumerate(summaries):
+                for identifier, size in summary['species']:
+                    table[i, columns[identifier]] = size
+            ax.stackplot([summary['gen'] for summary in summaries], table.transpose())
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Testing
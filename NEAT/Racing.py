@@ -0,0 +1,79 @@
+import numpy as np
+
+
+class Racing:
+    """
+    Evaluation scheduler for noisy fitnesses made of several episodes (racing / successive halving)
+
+    Every genome plays a few episodes, then the ones that are clearly worse than the best part of the population
+    are dropped, and the survivors play twice as many episodes, and so on until they reach the full budget
+    """
+
+    def __init__(self, episodes = 20, firstEpisodes = 2, keep = 0.5, confidence = 2.0):
+        """
+        Make a new scheduler
+
+        Params
+        ----------
+        episodes : max nb of episodes played by a genome (int, default 20)
+        firstEpisodes : nb of episodes played by every genome (int, default 2)
+        keep : part of the genomes that always goes to the next round (float, default 0.5)
+        confidence : width of the confidence intervals, in standard errors (float, default 2.0)
+                     A genome is dropped when its interval is completely below the one of the last kept genome
+                     (0 : plain successive halving, only the best part of the genomes goes to the next round)
+        """
+        self.episodes = episodes
+        self.firstEpisodes = firstEpisodes
+        self.keep = keep
+        self.confidence = confidence
+        self.used = 0  # Nb of episodes played during the last evaluation
+
+    def __repr__(self):
+        """
+        Defines how a scheduler is shown in console
+        """
+        text = 'Racing - {} episodes max - {} played last time'.format(self.episodes, self.used)
+        return '<{}>'.format(text)
+
+    def evaluate(self, genomes, episodeFitness, rng = None):
+        """
+        Give a raw fitness to the genomes (the average score of the episodes they played)
+
+        Params
+        ----------
+        genomes : (Genome list)
+        episodeFitness : plays one episode (func : (genome, rng) -> score)
+        rng : Random generator given to the episodes (np.random.Generator, default np.random)
+        """
+        if rng is None:
+            rng = np.random
+        total = np.zeros(len(genomes))
+        squares = np.zeros(len(genomes))
+        count = np.zeros(len(genomes), dtype=int)
+        alive = np.arange(len(genomes))
+        step = min(self.firstEpisodes, self.episodes)
+        while len(alive) and step > 0:
+            # Play the episodes of this round
+            for i in alive:
+                for episode in range(step):
+                    score = episodeFitness(genomes[i], rng)
+                    total[i] += score
+                    squares[i] += score**2
+                count[i] += step
+            played = count[alive[0]]  # Every genome still alive has played as many episodes
+            if played >= self.episodes:
+                break
+            # Drop the genomes that are dominated by the last one we keep
+            mean = total[alive] / played
+            error = np.sqrt(np.maximum(squares[alive] / played - mean**2, 0) / played)
+            ranking = np.argsort(-mean, kind='stable')
+            last = ranking[max(int(np.ceil(self.keep * len(alive))), 1) - 1]
+            lower = mean[last] - self.confidence * error[last]
+            alive = alive[mean + self.confidence * error >= lower]
+            # The survivors play twice as many episodes
+            step = min(played, self.episodes - played)
+
+        for genome, score, n in zip(genomes, total, count):
+            genome.rawFitness = score / n if n else 0
+            genome.episodes = n
+        self.used = int(count.sum())
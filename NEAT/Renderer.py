@@ -0,0 +1,121 @@
+import os
+import shutil
+import threading
+import queue
+from copy import copy
+
+
+class Renderer:
+    """
+    Render genomes to files in a background thread (never opens a viewer, never blocks the caller)
+    Genomes with the same topology are only rendered once (see Genome.structureHash)
+    """
+
+    def __init__(self, directory = 'renders', format = 'svg'):
+        """
+        Make a new renderer
+
+        Params
+        ----------
+        directory : where the files are written (str, default 'renders')
+        format : format of the files (str, default 'svg')
+        """
+        self.directory = directory
+        self.format = format
+        os.makedirs(directory, exist_ok = True)
+        # structure hash -> file that has already been rendered for this topology
+        # Note : the colors of the edges are the ones of the first genome rendered with this topology
+        self.cache = {}
+        self.rendered = 0  # Nb of graphs that went through graphviz
+        self.cached = 0  # Nb of graphs that were copied from the cache
+        self.errors = []  # (name, exception) of the renders that failed
+        # The work is done by a daemon thread fed by a queue
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target = self.work, daemon = True)
+        self.thread.start()
+
+    def __repr__(self):
+        """
+        Defines how a renderer is shown in console
+        """
+        text = 'Renderer - {} rendered - {} cached - {} waiting'.format(self.rendered, self.cached, self.queue.qsize())
+        return '<{}>'.format(text)
+
+    def submit(self, genome, name):
+        """
+        Ask for a genome to be rendered (returns right away)
+
+        Params
+        ----------
+        genome : (Genome)
+        name : name of the file, without extension (str)
+        """
+        # Work on a copy : the genome might change before it's rendered
+        self.queue.put((copy(genome), name))
+
+    def path(self, name):
+        """
+        Path of the file of a render
+
+        Params
+        ----------
+        name : name of the render (str)
+        """
+        return os.path.join(self.directory, '{}.{}'.format(name, self.format))
+
+    def work(self):
+        """
+        Loop of the background thread
+        """
+        while True:
+            item = self.queue.get()
+            if item is None:
+                # Sent by close
+                self.queue.task_done()
+                return
+            genome, name = item
+            try:
+                self.render(genome, name)
+            except Exception as exception:
+                # We don't want a broken render to kill the thread
+                self.errors.append((name, exception))
+            finally:
+                self.queue.task_done()
+
+    def render(self, genome, name):
+        """
+        Render a genome (or copy the file of a genome with the same topology)
+
+        Params
+        ----------
+        genome : (Genome)
+        name : name of the file, without extension (str)
+        """
+        key = genome.structureHash()
+        path = self.path(name)
+        if key in self.cache:
+            if self.cache[key] != path:
+                shutil.copyfile(self.cache[key], path)
+            self.cached += 1
+            return
+        data = genome.graph().pipe(format = self.format)
+        with open(path, 'wb') as file:
+            file.write(data)
+        self.cache[key] = path
+        self.rendered += 1
+
+    def wait(self):
+        """
+        Wait until everything that has been submitted is rendered
+        """
+        self.queue.join()
+
+    def close(self):
+        """
+        Render everything that has been submitted, then stop the background thread
+        """
+        if not self.thread.is_alive():
+            return
+        self.wait()
+        self.queue.put(None)
+        self.thread.join()
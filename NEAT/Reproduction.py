@@ -0,0 +1,84 @@
+import numpy as np
+from copy import copy
+from .Genome import Genome
+from .History import History
+from .Node import Node
+
+
+def reproduce(job):
+    """
+    Make a batch of children (runs in a worker process, or in the main one)
+    The innovations made here get temporary numbers, see mergeInnovations
+
+    Params
+    ----------
+    job : (seed, parents, recipes, innovation history, innovation number)
+          recipes are tuples of indexes in parents : (i,) for a mutated copy, (i, j) for a crossover
+
+    Returns
+    ----------
+    (children, new innovations) : the new innovations are (nodeIn, nodeOut, temporary number), in order
+    """
+    seed, parents, recipes, innovationHistory, innovationNumber = job
+    rng = np.random.default_rng(seed)
+    # Work on our own copy of the innovation history
+    saved = Genome.innovationHistory, History.innovationNumber
+    Genome.innovationHistory = list(innovationHistory)
+    History.innovationNumber = innovationNumber
+    try:
+        children = []
+        for recipe in recipes:
+            if len(recipe) == 1:
+                child = copy(parents[recipe[0]])
+            else:
+                child = Genome.crossover(parents[recipe[0]], parents[recipe[1]], rng)
+            child.mutate(rng)
+            children.append(child)
+        newInnovations = []
+        for innovation in Genome.innovationHistory[len(innovationHistory):]:
+            newInnovations.append((innovation.nodeIn, innovation.nodeOut, innovation.number))
+    finally:
+        Genome.innovationHistory, History.innovationNumber = saved
+    return children, newInnovations
+
+
+def mergeInnovations(children, newInnovations, innovationNumber):
+    """
+    Give their real innovation numbers to the innovations of a job (in the main process)
+    Jobs have to be merged in the same order every time for the result to be the same
+
+    Params
+    ----------
+    children : children made by the job (Genome list)
+    newInnovations : innovations made by the job (see reproduce)
+    innovationNumber : innovation number at the start of the job (int)
+    """
+    # temporary number -> real number
+    renumber = {}
+
+    def translate(node):
+        # New nodes are numbered after the connection they split (which might be new too)
+        if node.number in renumber:
+            return Node((renumber[node.number], node.identifier[1]), node.kind, activation = node.activation)
+        return node
+
+    for nodeIn, nodeOut, number in newInnovations:
+        renumber[number] = Genome.getInnovationNumber(translate(nodeIn), translate(nodeOut))
+
+    for child in children:
+        renumbered = False
+        for node in child.nodeList:
+            if node.number > innovationNumber:
+                renumbered = True
+                defaultName = node.name == str(node.identifier[0]) + '.' + str(node.identifier[1])
+                node.identifier = (renumber[node.number], node.identifier[1])
+                node.number = node.identifier[0]
+                if defaultName:
+                    node.name = str(node.identifier[0]) + '.' + str(node.identifier[1])
+        for con in child.connectionList:
+            if con.innovationNumber > innovationNumber:
+                con.innovationNumber = renumber[con.innovationNumber]
+                renumbered = True
+        if renumbered:
+            # Its structure hash has changed
+            child.invalidate()
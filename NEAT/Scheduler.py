@@ -0,0 +1,119 @@
+from collections import deque
+from .Transport import SharedPopulation, evaluateSlice
+
+
+def evaluateGenomes(job):
+    """
+    Give a fitness to a batch of genomes (runs in a worker process)
+
+    Params
+    ----------
+    job : (fitness, genomes), fitness has to be picklable (a function defined at the top of a module)
+    """
+    fitness, genomes = job
+    return [fitness(genome) for genome in genomes]
+
+
+class Scheduler:
+    """
+    Evaluate the genomes of a gen batch after batch, in the order they are made (see Population.newPop)
+    With a pool, a batch is evaluated by the workers while the next children are made, and the results are
+    given back in the same order (the speciation can go through a batch while the next ones are evaluated)
+    """
+
+    def __init__(self, fitness = None, phenotypeFitness = None, pool = None, dtype = float):
+        """
+        Make a new scheduler
+
+        Params
+        ----------
+        fitness : (func : genome -> fitness, used if phenotypeFitness isn't given)
+        phenotypeFitness : (func : phenotype -> fitness, the genes go to the workers through shared memory,
+                           see Transport.py)
+        pool : workers that evaluate the batches (concurrent.futures.Executor, default None : evaluated right away)
+        dtype : precision of the evaluations of phenotypeFitness (np.dtype, default float64)
+        """
+        self.fitness = fitness
+        self.phenotypeFitness = phenotypeFitness
+        self.pool = pool
+        self.dtype = dtype
+        # (genomes, future, fitness or shared population) of the batches not given back yet, in order
+        self.pending = deque()
+
+    def __repr__(self):
+        """
+        Defines how a scheduler is shown in console
+        """
+        text = 'Scheduler - {} batches pending'.format(len(self.pending))
+        return '<{}>'.format(text)
+
+    def submit(self, genomes):
+        """
+        Ask for a batch of genomes to be evaluated (returns right away if there is a pool)
+
+        Params
+        ----------
+        genomes : (Genome list)
+        """
+        if len(genomes) == 0:
+            return
+        if self.phenotypeFitness is not None:
+            shared = SharedPopulation(genomes, self.dtype)
+            job = (shared.descriptor, 0, len(genomes), self.phenotypeFitness)
+            if self.pool is None:
+                evaluateSlice(job)
+                self.pending.append((genomes, None, self.collect(shared)))
+            else:
+                self.pending.append((genomes, self.pool.submit(evaluateSlice, job), shared))
+        elif self.pool is None:
+            self.pending.append((genomes, None, [self.fitness(genome) for genome in genomes]))
+        else:
+            self.pending.append((genomes, self.pool.submit(evaluateGenomes, (self.fitness, genomes)), None))
+
+    @staticmethod
+    def collect(shared):
+        """
+        Get the fitness out of a shared population and free it
+
+        Params
+        ----------
+        shared : (SharedPopulation)
+        """
+        fitness = shared.fitness.copy()
+        shared.close()
+        return fitness
+
+    def results(self):
+        """
+        Give back the batches in the order they were submitted, as soon as they are evaluated
+        (the raw fitness of their genomes is set)
+        """
+        while self.pending:
+            genomes, future, fitness = self.pending.popleft()
+            if future is not None:
+                if isinstance(fitness, SharedPopulation):
+                    shared = fitness
+                    try:
+                        future.result()
+                    finally:
+                        # Freed even if the evaluation failed (nobody else knows about it anymore)
+                        fitness = self.collect(shared)
+                else:
+                    fitness = future.result()
+            for genome, value in zip(genomes, fitness):
+                genome.rawFitness = float(value)
+            yield genomes
+
+    def clear(self):
+        """
+        Forget the batches not given back yet
+        """
+        while self.pending:
+            genomes, future, fitness = self.pending.popleft()
+            if future is not None:
+                future.cancel()
+                if isinstance(fitness, SharedPopulation):
+                    # The workers have to be done with the memory before it's freed
+                    if not future.cancelled():
+                        future.exception()
+                    fitness.close()
@@ -13,6 +13,7 @@ class Species:
         ----------
         genome : The genome that required this new species (Genome)
         """
+        self.id = None  # Given by the population
         self.mascot = genome  # The genome which represent the species
         self.genomeList = [genome]  # Members of the species
         self.best = genome  # Best : best net of the species of all time
@@ -24,20 +25,18 @@ class Species:
         # Be able to graph it
         self.populationHistory = []
 
-    def matches(self, genome):
+    def matches(self, genome, c1 = 1.0, c2 = 1.0, c3 = 0.4, threshold = 3):
         """
         Say if a genome belong to the species
 
         Params
         ----------
         genome : The genome we are testing (Genome)
+        c1 : Constant of the 'distance' related to excess genes (float, default 1.0)
+        c2 : Constant of the 'distance' related to disjoint genes (float, default 1.0)
+        c3 : Constant of the 'distance' related to avg. weight diff. (float, default 0.4)
+        threshold : Max distance between a genome and the mascot of its species (float, default 3)
         """
-        # Define the constants used by the 'distance' function
-        c1 = 1.0  # Related to excess genes
-        c2 = 1.0  # Related to disjoint genes
-        c3 = 0.4  # Related to avg. weight diff.
-        threshold = 3
-
         # Determine the fittest genome
         if genome.rawFitness > self.mascot.rawFitness:
             genome1 = genome
@@ -127,59 +126,6 @@ class Species:
         self.genomeList.append(genome)
 
 
-    def shareFitness(self):
-        """
-        'Share' the fitness inside the species
-        """
-        for genome in self.genomeList:
-            genome.sharedFitness = genome.rawFitness / len(self.genomeList)
-
-    def updateChamp(self):
-        """
-        Update the champ of the species (the best net of this gen)
-        """
-        self.sortGenomes()
-        self.champ = self.genomeList[0]
-        if self.champ.rawFitness > self.best.rawFitness:
-            self.best = self.champ
-            self.staleness = 0
-        else:
-            self.staleness += 1
-
-    def sortGenomes(self):
-        """
-        Sort the genomes by fitness (fittest first)
-        """
-        L = self.genomeList
-
-        n = len(L)
-        for i in range(1,n):
-            j = i
-            genome = L[i]
-            while 0 < j and genome.rawFitness > L[j-1].rawFitness :
-                L[j] = L[j-1]
-                j = j-1
-            L[j] = genome
-
-    def updateAverageFitness(self):
-        """
-        Updates the average fitness of the species
-        """
-        # Shared fitness are fitnesses divided by the number of genomes in the species
-        # So we only need to add those up
-        average = 0
-        for genome in self.genomeList:
-            average += genome.sharedFitness
-        self.averageFitness = average
-
-    def purge(self):
-        """
-        Kill the bottom half of the species
-        """
-        self.sortGenomes()
-        half = int(len(self.genomeList)+1 / 2)  # Species with only 1 genome have their genome saved
-        self.genomeList = self.genomeList[:half]
-
     def isEmpty(self):
         """
         Tell is the species is empty or not
@@ -192,21 +138,34 @@ class Species:
         """
         self.genomeList = []
 
-    def updateMascot(self):
+    def updateMascot(self, rng = None):
         """
         Update the mascot (take a random genome amongst the genomes in the species)
+
+        Params
+        ----------
+        rng: Random generator (np.random.Generator, default np.random)
         """
-        self.mascot = np.random.choice(self.genomeList)
+        if rng is None:
+            rng = np.random
+        self.mascot = self.genomeList[rng.choice(len(self.genomeList))]
 
 
-    def selectGenome(self):
+    def selectGenome(self, rng = None):
         """
         Select a genome based on it's fitness
+
+        Params
+        ----------
+        rng: Random generator (np.random.Generator, default np.random)
         """
+        if rng is None:
+            rng = np.random
         totalSum = 0
         fitnessList = []
         for genome in self.genomeList:
             totalSum += genome.sharedFitness
             fitnessList.append(genome.sharedFitness)
-        probability = np.array(fitnessList) / totalSum
-        return np.random.choice(self.genomeList, p = probability)
\ No newline at end of file
+        # Every fitness is 0 (a complexity penalty can do that) : all the genomes have the same chance
+        probability = np.array(fitnessList) / totalSum if totalSum > 0 else None
+        return self.genomeList[rng.choice(len(self.genomeList), p = probability)]
\ No newline at end of file
@@ -1,35 +1,24 @@
 """
 The XOR test !
+Run it from the root of the repository : python -m NEAT.Testing
 """
-from Population import Population
-
-found = False
+from NEAT import Population
+import numpy as np
 
+# The XOR dataset
+inputs = np.array([[0, 0], [0, 1], [1, 0], [1, 1]])
+targets = np.array([0, 1, 1, 0])
 
-def fitness(genome):
-    dist = 0
-    solve = 0
-    global found
-    for i in (0,1):
-        for j in (0,1):
-            output = genome.evaluate((i,j))
-            genome.clearNodes()  # Clear the nodes because of recurrent connections
-            value = output[0]
-            dist += abs(value - ((i and (not j)) or ((not i) and j)))
-            if (value > 0.5) == ((i and (not j)) or ((not i) and j)):
-                solve += 1
-    if solve == 4:
-        found = True
-    return (4-dist)**2
-
-p = Population()
 p = Population(sensor = 2, output = 1, bias = True,
-               initState = 'all linked', fitness = fitness,
+               initState = 'all linked', dataset = (inputs, targets), loss = 'distance',
                sensorName = ('In1', 'In2', 'Bias'), outputName = ('Out',), demography = 150)
 
+found = False
 
 while not found :
     p.nextGen() # Todo : Make 'updateGenStat' take less time
+    # Solved once every output of the best genome is on the right side of 0.5
+    found = p.best.scoreDataset(inputs, targets, 'accuracy') == 1
     if found:
         print()
         print('XOR Solved !')
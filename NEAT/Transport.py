@@ -0,0 +1,135 @@
+import numpy as np
+from multiprocessing import shared_memory
+from .Checkpoint import packGenomes
+from .Phenotype import Phenotype
+
+
+# Arrays of a pack (see Checkpoint.packGenomes) that are put in shared memory
+sharedArrays = ('nodes', 'connections', 'weights', 'nodeStart', 'connectionStart', 'sensor', 'output', 'bias')
+
+
+class SharedPopulation:
+    """
+    The genes of a whole population laid out in a shared memory block, and a shared array for their fitness
+    Worker processes attach to them with the descriptor (a small dict) : the genes are never copied nor unpickled
+    """
+
+    def __init__(self, genomes, dtype = float):
+        """
+        Put the genes of the genomes in shared memory
+
+        Params
+        ----------
+        genomes : (Genome list)
+        dtype : precision of the evaluations made by the workers (np.dtype, default float64)
+        """
+        pack = packGenomes(genomes)
+        # Every array starts on a multiple of 8 bytes
+        layout = {}
+        size = 0
+        for key in sharedArrays:
+            layout[key] = (pack[key].dtype.str, pack[key].shape, size)
+            size += -(-pack[key].nbytes // 8) * 8
+        self.genes = shared_memory.SharedMemory(create = True, size = max(size, 1))
+        self.results = shared_memory.SharedMemory(create = True, size = max(8 * len(genomes), 1))
+        self.descriptor = {'genes' : self.genes.name,
+                           'results' : self.results.name,
+                           'layout' : layout,
+                           'activations' : pack['activations'],
+                           'count' : len(genomes),
+                           'dtype' : np.dtype(dtype).str}
+        arrays = views(self.genes, layout)
+        for key in sharedArrays:
+            arrays[key][...] = pack[key]
+        del arrays
+        self.fitness = np.ndarray((len(genomes),), dtype=np.float64, buffer=self.results.buf)
+        self.fitness[:] = 0
+
+    def __repr__(self):
+        """
+        Defines how a shared population is shown in console
+        """
+        text = 'SharedPopulation - {} genomes - {} bytes'.format(self.descriptor['count'], self.genes.size)
+        return '<{}>'.format(text)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Free the shared memory (the workers have to be done with it)
+        """
+        # The arrays that use the memory have to be gone before it's closed
+        self.fitness = None
+        for block in (self.genes, self.results):
+            block.close()
+            block.unlink()
+
+
+def views(block, layout):
+    """
+    Numpy arrays on a shared memory block (nothing is copied)
+
+    Params
+    ----------
+    block : (SharedMemory)
+    layout : name -> (dtype, shape, offset) (dict)
+    """
+    arrays = {}
+    for key, (dtype, shape, offset) in layout.items():
+        arrays[key] = np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)
+    return arrays
+
+
+def sharedPhenotype(arrays, activations, i, dtype = float):
+    """
+    Compile genome i straight from the shared arrays (see Genome.compile)
+
+    Params
+    ----------
+    arrays : the shared arrays (see views)
+    activations : names of the activations (str list)
+    i : index of the genome (int)
+    dtype : precision of the evaluations (np.dtype, default float64)
+    """
+    nodeStart, nodeStop = arrays['nodeStart'][i], arrays['nodeStart'][i+1]
+    connectionStart, connectionStop = arrays['connectionStart'][i], arrays['connectionStart'][i+1]
+    connections = arrays['connections'][connectionStart:connectionStop]
+    enabled = connections[:, 2] != 0
+    weights = arrays['weights'][connectionStart:connectionStop][enabled].astype(dtype)
+    nodeActivations = [activations[code] for code in arrays['nodes'][nodeStart:nodeStop, 3]]
+    return Phenotype(nodeActivations, connections[enabled, 0], connections[enabled, 1], weights,
+                     int(arrays['sensor'][i]), int(arrays['output'][i]), bool(arrays['bias'][i]))
+
+
+def evaluateSlice(job):
+    """
+    Give a fitness to a slice of a shared population (runs in a worker process, or in the main one)
+    The fitness goes in the shared result array
+
+    Params
+    ----------
+    job : (descriptor, start, stop, fitness)
+          fitness has to be picklable (a function defined at the top of a module) : phenotype -> fitness
+    """
+    descriptor, start, stop, fitness = job
+    genes = shared_memory.SharedMemory(name = descriptor['genes'])
+    results = shared_memory.SharedMemory(name = descriptor['results'])
+    arrays = None
+    values = None
+    try:
+        arrays = views(genes, descriptor['layout'])
+        values = np.ndarray((descriptor['count'],), dtype=np.float64, buffer=results.buf)
+        dtype = np.dtype(descriptor['dtype'])
+        for i in range(start, stop):
+            values[i] = fitness(sharedPhenotype(arrays, descriptor['activations'], i, dtype))
+    finally:
+        # The arrays that use the memory have to be gone before it's closed
+        arrays = None
+        values = None
+        genes.close()
+        results.close()
+    return stop - start
@@ -0,0 +1,13 @@
+"""
+NEAT : NeuroEvolution of Augmenting Topologies
+
+The core only needs numpy, drawing (graphviz) and graphing (matplotlib) are imported when they are used
+"""
+from .Activation import addActivation, getActivation
+from .Node import Node
+from .Connection import Connection
+from .History import History
+from .Phenotype import Phenotype
+from .Genome import Genome
+from .Species import Species
+from .Population import Population
@@ -0,0 +1,43 @@
+"""
+Hall of fame : the best genomes of all time, each one only once, the ones pushed out of the memory are read back from the file
+"""
+from NEAT import Population
+from NEAT.Archive import HallOfFame
+
+
+def genomes(n):
+    # Random weights : every genome is different
+    p = Population(demography = n, initState = 'all linked', fitness = lambda genome: 0, seed = 0)
+    for i, genome in enumerate(p.genomeList):
+        genome.rawFitness = float(i)
+    return p.genomeList
+
+
+def test_top_with_spill(tmp_path):
+    genomeList = genomes(20)
+    hallOfFame = HallOfFame(3, str(tmp_path / 'hall.pkl'))
+    for genome in genomeList:
+        hallOfFame.add(genome)
+    # The same genome again doesn't take a second place
+    hallOfFame.add(genomeList[-1])
+    assert [genome.rawFitness for genome in hallOfFame] == [19, 18, 17]
+    assert len(hallOfFame.spilled) == 17
+    top = hallOfFame.top(6)
+    assert [genome.rawFitness for genome in top] == [19, 18, 17, 16, 15, 14]
+    # The genomes read from the file are the ones that were written
+    for genome in top[3:]:
+        assert genome.genomeHash() == genomeList[int(genome.rawFitness)].genomeHash()
+        assert genome.evaluate([1, 0]) == genomeList[int(genome.rawFitness)].evaluate([1, 0])
+    # A genome that is in the file doesn't get in again
+    hallOfFame.add(genomeList[5])
+    assert len(hallOfFame) == 3 and len(hallOfFame.spilled) == 17
+
+
+def test_top_without_file():
+    genomeList = genomes(10)
+    hallOfFame = HallOfFame(3)
+    for genome in reversed(genomeList):
+        hallOfFame.add(genome)
+    assert [genome.rawFitness for genome in hallOfFame.top(5)] == [9, 8, 7]
+    # The forgotten genomes can get in again
+    assert len(hallOfFame.hashes) == 3
@@ -0,0 +1,54 @@
+"""
+Checkpoints : written in the background, pruned, and a restored population goes on as if it had never stopped
+"""
+import os
+import numpy as np
+import pytest
+from NEAT import Population
+from NEAT.Checkpoint import Checkpointer, packGenomes, unpackGenomes
+
+
+def xor(genome):
+    error = 0
+    for a in (0, 1):
+        for b in (0, 1):
+            error += abs(genome.evaluate([a, b])[0] - (a ^ b))
+    return (4 - error)**2
+
+
+def state(p):
+    pack = packGenomes(p.genomeList)
+    return pack['connections'].tolist(), pack['weights'].tolist(), p.best.rawFitness, len(p.speciesList)
+
+
+def test_write_prune_and_restore(tmp_path):
+    directory = str(tmp_path)
+    p = Population(demography = 40, initState = 'all linked', fitness = xor, seed = 4,
+                   checkpointDirectory = directory, checkpointEvery = 4, checkpointKeep = 2)
+    for i in range(12):
+        p.nextGen()
+    p.close()
+    # Only the 2 last ones are kept
+    assert sorted(os.listdir(directory)) == ['gen00000008.pkl.gz', 'gen00000012.pkl.gz']
+    latest = p.checkpointer.latest()
+    for i in range(5):
+        p.nextGen()
+    q = Population.restore(latest, fitness = xor, checkpointDirectory = None)
+    for i in range(5):
+        q.nextGen()
+    assert state(p) == state(q)
+
+
+def test_pack_round_trip():
+    p = Population(demography = 20, initState = 'all linked', fitness = xor, seed = 1)
+    for i in range(5):
+        p.nextGen()
+    genomes = unpackGenomes(packGenomes(p.genomeList))
+    for genome, other in zip(p.genomeList, genomes):
+        assert genome.structureHash() == other.structureHash()
+        assert genome.evaluate([1, 0]) == other.evaluate([1, 0])
+
+
+def test_keep_has_to_be_positive(tmp_path):
+    with pytest.raises(ValueError):
+        Checkpointer(str(tmp_path), keep = 0)
@@ -0,0 +1,45 @@
+"""
+Population.close stops everything the population runs in the background
+"""
+import os
+import urllib.request
+import pytest
+from NEAT import Population
+
+
+def population(**kwargs):
+    return Population(demography = 20, initState = 'all linked', fitness = lambda genome: 1, seed = 0, **kwargs)
+
+
+def test_close_stops_the_metrics(tmp_path):
+    path = str(tmp_path / 'neat.prom')
+    p = population(metricsFile = path, metricsPort = 0)
+    port = p.metrics.port
+    p.nextGen()
+    writer = p.metrics.writer
+    p.close()
+    assert not writer.is_alive()
+    # The last values are written before the writer stops
+    with open(path) as file:
+        assert 'neat_generation 2.0' in file.read()
+    with pytest.raises(OSError):
+        urllib.request.urlopen('http://127.0.0.1:{}/'.format(port), timeout = 1)
+
+
+def test_close_writes_the_last_checkpoint(tmp_path):
+    p = population(checkpointDirectory = str(tmp_path), checkpointEvery = 2, checkpointKeep = None)
+    for i in range(4):
+        p.nextGen()
+    thread = p.checkpointer.thread
+    p.close()
+    assert not thread.is_alive()
+    assert sorted(os.listdir(str(tmp_path))) == ['gen00000002.pkl.gz', 'gen00000004.pkl.gz']
+
+
+def test_close_stops_the_renderer(tmp_path):
+    p = population(renderDirectory = str(tmp_path))
+    thread = p.renderer.thread
+    p.close()
+    assert not thread.is_alive()
+    # Closing twice is fine
+    p.close()
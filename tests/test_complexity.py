@@ -0,0 +1,52 @@
+"""
+Complexity caps, delete mutations and complexity penalty
+"""
+import numpy as np
+from NEAT import Population, Genome
+
+
+def test_caps_and_delete_mutations():
+    p = Population(demography = 60, initState = 'all linked', fitness = lambda genome: len(genome.connectionList),
+                   seed = 2, maxHidden = 2, maxConnections = 8, deleteConnectionRate = 0.1, deleteNodeRate = 0.1)
+    for i in range(20):
+        p.nextGen()
+        for genome in p.genomeList:
+            assert genome.hiddenCount() <= 2
+            assert len(genome.connectionList) <= 8
+            identifiers = [node.identifier for node in genome.nodeList]
+            assert len(identifiers) == len(set(identifiers))
+            for con in genome.connectionList:
+                assert con.nodeIn.identifier in identifiers and con.nodeOut.identifier in identifiers
+
+
+def test_delete_node_removes_its_connections():
+    genome = Genome(2, 1, np.random.default_rng(0), initState = 'all linked')
+    genome.addNodeMutation(np.random.default_rng(1))
+    assert genome.hiddenCount() == 1
+    genome.deleteNodeMutation(np.random.default_rng(2))
+    assert genome.hiddenCount() == 0
+    assert len(genome.connectionList) == 3
+    # A node added afterwards doesn't get the identifier of a node that is still there
+    genome.addNodeMutation(np.random.default_rng(3))
+    genome.addNodeMutation(np.random.default_rng(3))
+    identifiers = [node.identifier for node in genome.nodeList]
+    assert len(identifiers) == len(set(identifiers))
+
+
+def test_delete_connection_removes_lonely_hidden_nodes():
+    genome = Genome(1, 1, np.random.default_rng(0), bias = False, initState = 'all linked')
+    genome.addNodeMutation(np.random.default_rng(1))
+    # The disabled connection, then the 2 connections of the hidden node
+    while genome.connectionList:
+        genome.deleteConnectionMutation(np.random.default_rng(0))
+    assert genome.hiddenCount() == 0
+
+
+def test_penalty_that_cancels_every_fitness():
+    # Every shared fitness is 0 : the parents are picked uniformly instead of failing
+    p = Population(demography = 30, initState = 'all linked', fitness = lambda genome: 1, seed = 0,
+                   complexityPenalty = 1.0)
+    for i in range(3):
+        p.nextGen()
+    assert len(p.genomeList) == 30
+    assert np.all(p.sharedFitness == 0)
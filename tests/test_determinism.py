@@ -0,0 +1,59 @@
+"""
+For a given seed, the gens don't depend on the nb of workers, nor on the pipeline or the transport used
+"""
+import numpy as np
+import pytest
+from NEAT import Population, Genome, History
+from NEAT.Checkpoint import packGenomes
+
+INPUTS = np.array([[0, 0], [0, 1], [1, 0], [1, 1]], dtype=float)
+TARGETS = np.array([0, 1, 1, 0], dtype=float)
+
+
+# Defined at the top of the module : the workers have to be able to get them
+def xor(genome):
+    error = 0
+    for inputs, target in zip(INPUTS.tolist(), TARGETS.tolist()):
+        error += abs(genome.evaluate(inputs)[0] - target)
+    return (4 - error)**2
+
+
+def phenotypeXor(phenotype):
+    return (4 - np.abs(phenotype.evaluate(INPUTS)[:, 0] - TARGETS).sum())**2
+
+
+def run(**kwargs):
+    # The innovation history is shared by every population of the process : start from scratch
+    Genome.innovationHistory = []
+    History.innovationNumber = 0
+    p = Population(demography = 60, initState = 'all linked', seed = 11, **kwargs)
+    try:
+        for i in range(10):
+            p.nextGen()
+        return packGenomes(p.genomeList), p.best.rawFitness
+    finally:
+        p.close()
+
+
+def assertSame(pack1, pack2):
+    for key in ('nodes', 'connections', 'weights', 'nodeStart', 'connectionStart'):
+        assert np.array_equal(pack1[key], pack2[key]), key
+
+
+@pytest.mark.parametrize('kwargs', [{'workers' : 2},
+                                    {'workers' : 3},
+                                    {'pipeline' : True},
+                                    {'workers' : 2, 'pipeline' : True}])
+def test_same_gens_with_workers(kwargs):
+    reference, best = run(fitness = xor)
+    pack, other = run(fitness = xor, **kwargs)
+    assertSame(reference, pack)
+    assert best == other
+
+
+@pytest.mark.parametrize('kwargs', [{'workers' : 2}, {'workers' : 2, 'pipeline' : True}])
+def test_same_gens_with_shared_memory(kwargs):
+    reference, best = run(phenotypeFitness = phenotypeXor)
+    pack, other = run(phenotypeFitness = phenotypeXor, **kwargs)
+    assertSame(reference, pack)
+    assert best == other
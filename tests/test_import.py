@@ -0,0 +1,53 @@
+"""
+Importing the core of the package has to stay fast and headless
+"""
+import os
+import subprocess
+import sys
+
+# Budget for 'import NEAT', once numpy is already imported (s)
+BUDGET = 0.5
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CODE = '''
+import sys, time
+import numpy
+start = time.perf_counter()
+import NEAT
+print(time.perf_counter() - start)
+print(' '.join(m for m in ('matplotlib', 'graphviz', 'http.server', 'concurrent.futures') if m in sys.modules))
+'''
+
+
+def importNeat():
+    # A new interpreter, so that nothing is already imported
+    result = subprocess.run([sys.executable, '-c', CODE], cwd = ROOT, capture_output = True, text = True, check = True)
+    duration, modules = result.stdout.split('\n')[:2]
+    return float(duration), modules.split()
+
+
+def test_import_is_headless():
+    duration, modules = importNeat()
+    assert modules == []
+
+
+def test_import_budget():
+    # Best of a few runs, the first one might pay for a cold disk cache
+    duration = min(importNeat()[0] for i in range(3))
+    assert duration < BUDGET
+
+
+def test_core_works_without_extras():
+    # None in sys.modules makes any import of them fail, as if they weren't installed
+    code = '''
+import sys
+sys.modules['graphviz'] = sys.modules['matplotlib'] = None
+from NEAT import Population
+p = Population(demography = 20, sensor = 2, output = 1, fitness = lambda genome: 1, seed = 0)
+p.nextGen()
+print(len(p.genomeList))
+'''
+    result = subprocess.run([sys.executable, '-c', code], cwd = ROOT, capture_output = True, text = True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ['20']
\ No newline at end of file
@@ -0,0 +1,25 @@
+"""
+Genome.initPopulation has to work with and without a random generator
+"""
+import numpy as np
+import pytest
+from NEAT import Genome
+
+
+@pytest.mark.parametrize('initState', ['one link', 'all linked', 'none'])
+def test_init_population_default_rng(initState):
+    genomes = Genome.initPopulation(5, 2, 1, initState = initState)
+    assert len(genomes) == 5
+    for genome in genomes:
+        assert len(genome.nodeList) == 4
+        assert genome.evaluate([0.5, 0.5])
+
+
+@pytest.mark.parametrize('initState', ['one link', 'all linked'])
+def test_init_population_seeded(initState):
+    first = Genome.initPopulation(5, 2, 1, np.random.default_rng(3), initState = initState)
+    second = Genome.initPopulation(5, 2, 1, np.random.default_rng(3), initState = initState)
+    for genome1, genome2 in zip(first, second):
+        assert [con.weight for con in genome1.connectionList] == [con.weight for con in genome2.connectionList]
+        assert [con.innovationNumber for con in genome1.connectionList] == \
+            [con.innovationNumber for con in genome2.connectionList]
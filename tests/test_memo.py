@@ -0,0 +1,51 @@
+"""
+Memorized outputs : repeated inputs are hits, and a mutation makes the genome forget what it memorized
+"""
+import numpy as np
+from NEAT import Population
+
+
+def genome(seed = 3):
+    p = Population(demography = 10, initState = 'all linked', fitness = lambda genome: 0, seed = seed, memoSize = 3)
+    return p.genomeList[0]
+
+
+def fresh(genome, inputs):
+    # The outputs computed again, without the memorized ones
+    memo, genome.memo = genome.memo, None
+    outputs = genome.evaluate(inputs)
+    genome.memo = memo
+    return outputs
+
+
+def test_hits_and_size():
+    g = genome()
+    first = g.evaluate([1, 0])
+    assert g.evaluate([1, 0]) == first
+    assert g.memoStats()['hits'] == 1 and g.memoStats()['misses'] == 1
+    for x in (0.1, 0.2, 0.3):
+        g.evaluate([x, 0])
+    # Only the last 3 inputs are kept, [1, 0] was the oldest one
+    assert g.memoStats()['size'] == 3
+    assert (1, 0) not in g.memo
+    assert g.evaluate([1, 0]) == first
+
+
+def test_weight_mutation_forgets():
+    g = genome()
+    before = g.evaluate([1, 0])
+    rng = np.random.default_rng(0)
+    while fresh(g, [1, 0]) == before:
+        g.weightMutation(rng)
+    assert g.memoStats()['size'] == 0
+    assert g.evaluate([1, 0]) == fresh(g, [1, 0])
+
+
+def test_add_node_mutation_forgets():
+    g = genome()
+    before = g.evaluate([1, 0])
+    rng = np.random.default_rng(0)
+    while fresh(g, [1, 0]) == before:
+        g.addNodeMutation(rng)
+    assert g.memoStats()['size'] == 0
+    assert g.evaluate([1, 0]) == fresh(g, [1, 0])
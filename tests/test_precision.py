@@ -0,0 +1,65 @@
+"""
+float32 evaluation has to select the same genomes as float64
+"""
+import numpy as np
+from NEAT import Population
+
+
+def dataset():
+    rng = np.random.default_rng(0)
+    inputs = rng.random((500, 3))
+    targets = (inputs.sum(axis=1) > 1.5).astype(float)
+    return inputs, targets
+
+
+def population(precision):
+    return Population(demography = 80, sensor = 3, output = 1, initState = 'all linked', dataset = dataset(),
+                      seed = 7, precision = precision)
+
+
+def test_weights_are_stored_at_the_precision():
+    p = population('float32')
+    for i in range(3):
+        p.nextGen()
+    for genome in p.genomeList:
+        for connection in genome.connectionList:
+            assert -1 <= connection.weight <= 1
+            assert connection.weight == float(np.float32(connection.weight))
+        assert genome.weightVector().dtype == np.float32
+    assert p.evaluateBatch(dataset()[0]).dtype == np.float32
+
+
+def test_same_fitness_and_selection():
+    p64 = population('float64')
+    p32 = population('float32')
+    for i in range(5):
+        p64.nextGen()
+        p32.nextGen()
+        # Same population, scored at both precisions
+        fitness64 = p64.scoreDataset(*dataset())
+        fitness32 = p32.scoreDataset(*dataset())
+        assert np.allclose(fitness64, fitness32, rtol = 1e-4)
+        assert np.argmax(fitness64) == np.argmax(fitness32)
+    assert [len(s.genomeList) for s in p64.speciesList] == [len(s.genomeList) for s in p32.speciesList]
+
+
+def test_float32_matches_float64_on_the_same_genome():
+    p = population('float32')
+    p.nextGen()
+    inputs = dataset()[0]
+    for genome in p.genomeList[:10]:
+        outputs32 = genome.evaluateBatch(inputs)
+        outputs64 = genome.topology().evaluate(inputs, genome.weightVector().astype(np.float64))
+        assert outputs32.dtype == np.float32
+        assert np.allclose(outputs32, outputs64, atol = 1e-5)
+
+
+def test_evaluate_stays_in_float64():
+    p = population('float32')
+    p.nextGen()
+    for genome in p.genomeList[:10]:
+        for inputs in dataset()[0][:5].tolist():
+            # The pruned view and the node by node evaluation give the same outputs
+            outputs = genome.evaluate(inputs)
+            assert all(type(output) is float for output in outputs)
+            assert np.allclose(outputs, genome.evaluate(inputs, show = True), rtol = 1e-12, atol = 0)
@@ -0,0 +1,63 @@
+"""
+Rollout : every genome plays its own episode of a vectorized environment, all at once, and gets the sum of its rewards
+"""
+import numpy as np
+from NEAT import Population
+
+
+class Echo:
+    """
+    Each copy shows its last action back to the genome, the reward is the action
+    Copy i is done after i % 4 + 1 steps
+    """
+
+    def reset(self, n):
+        self.steps = np.zeros(n, dtype=int)
+        self.limits = np.arange(n) % 4 + 1
+        self.last = np.full(n, 0.5)
+        self.done = np.zeros(n, dtype=bool)
+        return self.observations()
+
+    def observations(self):
+        return np.stack([self.last, 1 - self.last], axis=1)
+
+    def step(self, actions):
+        # One row of actions per genome, the ones that are done have to be left out
+        assert np.all(actions[self.done] == 0)
+        action = actions[:, 0]
+        self.steps += 1
+        self.last = np.where(self.done, self.last, action)
+        self.done = self.done | (self.steps >= self.limits)
+        return self.observations(), action, self.done
+
+
+def episode(genome, limit):
+    # The same episode, one genome, one step at a time
+    last, reward = 0.5, 0
+    for step in range(limit):
+        last = genome.evaluate([last, 1 - last])[0]
+        reward += last
+    return reward
+
+
+def test_rollout_matches_one_genome_at_a_time():
+    p = Population(demography = 30, initState = 'all linked', fitness = lambda genome: 0, seed = 2)
+    for i in range(3):
+        p.nextGen()
+    p.rollout(Echo(), steps = 10)
+    for i, genome in enumerate(p.genomeList):
+        assert np.isclose(genome.rawFitness, episode(genome, i % 4 + 1))
+
+
+def test_steps_cut_the_episodes():
+    p = Population(demography = 12, initState = 'all linked', fitness = lambda genome: 0, seed = 2)
+    p.rollout(Echo(), steps = 2)
+    for i, genome in enumerate(p.genomeList):
+        assert np.isclose(genome.rawFitness, episode(genome, min(i % 4 + 1, 2)))
+
+
+def test_environment_gives_the_fitness():
+    p = Population(demography = 20, initState = 'all linked', environment = Echo(), rolloutSteps = 4, seed = 2)
+    p.nextGen()
+    assert max(genome.rawFitness for genome in p.genomeList) > 0
+    assert p.evaluations >= 20
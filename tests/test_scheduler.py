@@ -0,0 +1,36 @@
+"""
+Evaluations of the pipeline (see Scheduler.py)
+"""
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+import pytest
+from NEAT import Genome
+from NEAT.Scheduler import Scheduler
+
+
+def failing(phenotype):
+    raise ValueError('bad fitness')
+
+
+def test_shared_memory_is_freed_when_an_evaluation_fails():
+    genomes = Genome.initPopulation(4, 2, 1, initState = 'all linked')
+    with ThreadPoolExecutor(1) as pool:
+        scheduler = Scheduler(phenotypeFitness = failing, pool = pool)
+        scheduler.submit(genomes)
+        name = scheduler.pending[0][2].descriptor['genes']
+        with pytest.raises(ValueError):
+            list(scheduler.results())
+    assert not scheduler.pending
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name = name)
+
+
+def test_batches_come_back_in_order():
+    genomes = Genome.initPopulation(6, 2, 1, initState = 'all linked')
+    with ThreadPoolExecutor(2) as pool:
+        scheduler = Scheduler(fitness = lambda genome: genomes.index(genome), pool = pool)
+        scheduler.submit(genomes[:2])
+        scheduler.submit(genomes[2:])
+        batches = list(scheduler.results())
+    assert batches == [genomes[:2], genomes[2:]]
+    assert [genome.rawFitness for genome in genomes] == list(range(6))
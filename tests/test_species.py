@@ -0,0 +1,19 @@
+"""
+Speciation : every genome is in one species, and the species that die let their genomes go
+"""
+import numpy as np
+from NEAT import Population
+
+
+def test_species_table_rows_sum_to_the_demography():
+    # A constant fitness never improves : species go stale after 15 gens
+    p = Population(demography = 60, initState = 'all linked', fitness = lambda genome: 1, seed = 3, threshold = 1)
+    for i in range(40):
+        p.nextGen()
+    stale = [species for species in p.speciesHistory if species.staleness > 15]
+    assert stale
+    for species in stale:
+        if species not in p.speciesList:
+            assert species.genomeList == []
+    # The last row is the current gen, it isn't filled yet
+    assert np.array_equal(p.speciesTable[:-1].sum(axis=1), np.full(p.gen - 1, 60))